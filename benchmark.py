@@ -0,0 +1,96 @@
+"""
+测量 docx2markdown 的转换吞吐量（文档/秒）
+使用方法：
+    python benchmark.py <包含docx文件的文件夹> [--mode markdown|text|ndjson] [--repeat N]
+    python benchmark.py <包含docx文件的文件夹> --workers 2 4 8
+
+示例：
+    python benchmark.py corpus/ --mode text
+    python benchmark.py corpus/ --mode markdown
+    python benchmark.py big-docs/ --workers 2 4 8    # 单文档并行转换相对串行转换的加速比
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import docx
+
+from docx2markdown import docx_to_markdown
+from docx2markdown._docx_to_markdown import MODES, save_images
+from docx2markdown._parallel import write_markdown_parallel
+
+SUFFIXES = {"markdown": ".md", "text": ".txt", "ndjson": ".ndjson"}
+
+
+def benchmark_mode(files, mode, repeat):
+    """转换语料库中的所有文件 `repeat` 次，返回 (文档数, 秒)"""
+    suffix = SUFFIXES[mode]
+    with tempfile.TemporaryDirectory() as output_folder:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for index, docx_file in enumerate(files):
+                output_file = Path(output_folder) / f"{index}{suffix}"
+                docx_to_markdown(str(docx_file), str(output_file), mode=mode)
+        elapsed = time.perf_counter() - start
+    return len(files) * repeat, elapsed
+
+
+def benchmark_workers(files, workers, repeat):
+    """
+    测量单文档并行转换路径（markdown 模式）的耗时，返回秒
+    workers=1 时在当前进程中运行同一路径（DocumentContext + 分块转换），作为计算加速比的基准
+    """
+    with tempfile.TemporaryDirectory() as output_folder:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for index, docx_file in enumerate(files):
+                output_file = Path(output_folder) / f"{index}.md"
+                doc = docx.Document(str(docx_file))
+                images = save_images(doc, str(Path(output_folder) / ".imgs" / str(index)), output_folder)
+                with open(output_file, "w", encoding="utf-8") as md_file:
+                    write_markdown_parallel(doc, images, md_file, workers)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="docx2markdown 吞吐量测试")
+    parser.add_argument("corpus", help="包含 .docx 文件的文件夹")
+    parser.add_argument("--mode", action="append", choices=MODES,
+                        help="要测试的模式，可重复指定（默认：全部）")
+    parser.add_argument("--repeat", type=int, default=1, help="重复次数（默认：1）")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="测试单文档并行转换的进程数，报告相对串行转换和同一路径单进程运行的加速比")
+    options = parser.parse_args()
+
+    files = sorted(Path(options.corpus).rglob("*.docx"))
+    files = [f for f in files if not f.name.startswith("~$")]
+    if not files:
+        print(f"错误: 在 {options.corpus} 中没有找到 .docx 文件")
+        return
+
+    print(f"语料库: {len(files)} 个文件")
+    if options.workers:
+        # 用户实际在 docx_to_markdown(...) 串行转换与 workers=N 之间选择，以串行转换为主要基准；
+        # 同一路径的单进程耗时用于区分分块/序列化开销与并行收益
+        _, serial = benchmark_mode(files, "markdown", options.repeat)
+        baseline = benchmark_workers(files, 1, options.repeat)
+        print(f"{'串行转换':>10}: {serial:.2f} 秒")
+        print(f"{'1 进程(同一路径)':>10}: {baseline:.2f} 秒")
+        for workers in options.workers:
+            elapsed = benchmark_workers(files, workers, options.repeat)
+            print(f"{workers:>6} 进程: {elapsed:.2f} 秒, 相对串行转换 {serial / elapsed:.2f}x, "
+                  f"相对同一路径单进程 {baseline / elapsed:.2f}x")
+        return
+
+    for mode in options.mode or MODES:
+        count, elapsed = benchmark_mode(files, mode, options.repeat)
+        print(f"{mode:>10}: {count} 个文档, {elapsed:.2f} 秒, {count / elapsed:.1f} 文档/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,9 @@ DOCX ↔ Markdown 批量转换工具
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
-import threading
+import multiprocessing
+import subprocess
+import queue
 import sys
 import os
 
@@ -28,7 +30,7 @@ else:
     sys.path.insert(0, src_path)
 
 try:
-    from docx2markdown import docx_to_markdown, markdown_to_docx
+    from docx2markdown import BatchRunner, ResourceLimits
 except ImportError as e:
     error_msg = f"无法导入 docx2markdown 模块: {str(e)}\n路径: {src_path}"
     try:
@@ -45,6 +47,7 @@ class ConversionTab:
         self.conversion_type = conversion_type  # "docx2md" 或 "md2docx"
         self.file_list = []
         self.output_folder = ""
+        self.runner = None
         self.create_widgets()
     
     def create_widgets(self):
@@ -100,8 +103,19 @@ class ConversionTab:
         action_frame.grid(row=2, column=0, sticky=(tk.W, tk.E))
         action_frame.columnconfigure(0, weight=1)
         
-        self.convert_button = ttk.Button(action_frame, text="开始转换", command=self.start_conversion)
-        self.convert_button.grid(row=0, column=0, pady=5)
+        control_frame = ttk.Frame(action_frame)
+        control_frame.grid(row=0, column=0, pady=5)
+        
+        ttk.Label(control_frame, text="并发数:").grid(row=0, column=0, padx=(0, 5))
+        self.workers_var = tk.IntVar(value=min(4, os.cpu_count() or 1))
+        ttk.Spinbox(control_frame, from_=1, to=os.cpu_count() or 1, width=4,
+                    textvariable=self.workers_var).grid(row=0, column=1, padx=(0, 10))
+        
+        self.convert_button = ttk.Button(control_frame, text="开始转换", command=self.start_conversion)
+        self.convert_button.grid(row=0, column=2, padx=(0, 5))
+        
+        self.cancel_button = ttk.Button(control_frame, text="取消", command=self.cancel_conversion, state="disabled")
+        self.cancel_button.grid(row=0, column=3)
         
         # 进度条
         self.progress_var = tk.StringVar(value="就绪")
@@ -168,57 +182,92 @@ class ConversionTab:
             messagebox.showwarning("警告", "请先选择输出文件夹")
             return
         
-        # 在新线程中执行转换，避免界面冻结
-        thread = threading.Thread(target=self.convert_files, daemon=True)
-        thread.start()
-    
-    def convert_files(self):
-        """批量转换文件"""
-        total = len(self.file_list)
-        success_count = 0
-        fail_count = 0
+        try:
+            max_workers = max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            max_workers = 1
         
-        # 禁用转换按钮
+        # 在进程池中执行转换，界面线程只通过队列接收进度，避免界面冻结
+        # 使用默认资源限制，异常文档（如 zip 炸弹）只会导致该文件失败
+        self.runner = BatchRunner(self.file_list, self.output_folder, self.conversion_type,
+                                  max_workers=max_workers, limits=ResourceLimits())
+        self.fail_messages = []
         self.convert_button.config(state="disabled")
-        self.progress_bar['maximum'] = total
+        self.cancel_button.config(state="normal")
+        self.progress_bar['maximum'] = len(self.file_list)
         self.progress_bar['value'] = 0
-        
-        for index, input_file in enumerate(self.file_list, 1):
+        self.progress_var.set(f"正在转换 0/{len(self.file_list)}")
+        self.runner.start()
+        self.parent.after(100, self.poll_events)
+    
+    def cancel_conversion(self):
+        """取消转换，正在转换的文件会完成，其余文件跳过"""
+        if self.runner is not None:
+            self.runner.cancel()
+            self.cancel_button.config(state="disabled")
+            self.status_var.set("正在取消...")
+    
+    def poll_events(self):
+        """在界面线程中处理转换进度"""
+        while True:
             try:
-                input_path = Path(input_file)
-                
-                if self.conversion_type == "docx2md":
-                    # DOCX to MD
-                    output_filename = input_path.stem + ".md"
-                    output_path = Path(self.output_folder) / output_filename
-                    self.progress_var.set(f"正在转换 {index}/{total}: {input_path.name}")
-                    docx_to_markdown(str(input_path), str(output_path))
-                else:
-                    # MD to DOCX
-                    output_filename = input_path.stem + ".docx"
-                    output_path = Path(self.output_folder) / output_filename
-                    self.progress_var.set(f"正在转换 {index}/{total}: {input_path.name}")
-                    markdown_to_docx(str(input_path), str(output_path))
-                
-                success_count += 1
-                
-            except Exception as e:
-                fail_count += 1
-                print(f"转换失败 {input_file}: {e}")
+                event = self.runner.events.get_nowait()
+            except queue.Empty:
+                break
             
-            # 更新进度条
-            self.progress_bar['value'] = index
-            self.parent.update_idletasks()
+            if event.kind in ("done", "failed"):
+                name = Path(event.path).name
+                self.progress_bar['value'] = event.completed
+                if event.kind == "done":
+                    self.status_var.set(f"{name} 用时 {event.elapsed:.2f} 秒")
+                else:
+                    self.fail_messages.append(f"{name}: {event.error}")
+                    self.status_var.set(f"转换失败 {name}: {event.error}")
+                self.progress_var.set(
+                    f"已完成 {event.completed}/{event.total}  "
+                    f"速度 {event.throughput:.2f} 个/秒  剩余约 {event.eta:.0f} 秒")
+            else:
+                self.finish_conversion(event)
+                return
+        
+        self.parent.after(100, self.poll_events)
+    
+    def finish_conversion(self, event):
+        """转换结束后的界面处理"""
+        fail_count = len(self.fail_messages)
+        success_count = event.completed - fail_count
+        skipped_count = event.total - event.completed
+        
+        summary = f"成功: {success_count}, 失败: {fail_count}"
+        if event.kind == "cancelled":
+            summary += f", 已取消: {skipped_count}"
+        summary += f", 总用时: {event.elapsed:.1f} 秒"
         
-        # 转换完成
-        self.progress_var.set(f"转换完成！成功: {success_count}, 失败: {fail_count}")
+        self.progress_var.set(("转换已取消！" if event.kind == "cancelled" else "转换完成！") + summary)
         self.convert_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.runner = None
         # 打开输出文件夹
-        os.startfile(self.output_folder)
+        open_folder(self.output_folder)
         
         # 显示完成消息
-        messagebox.showinfo("完成", 
-                          f"转换完成！\n成功: {success_count}\n失败: {fail_count}")
+        message = summary.replace(", ", "\n")
+        if self.fail_messages:
+            message += "\n\n" + "\n".join(self.fail_messages[:10])
+        messagebox.showinfo("完成", message)
+
+
+def open_folder(folder):
+    """用系统文件管理器打开文件夹"""
+    try:
+        if sys.platform == "win32":
+            os.startfile(folder)
+        elif sys.platform == "darwin":
+            subprocess.Popen(["open", folder])
+        else:
+            subprocess.Popen(["xdg-open", folder])
+    except OSError:
+        pass
 
 
 class Docx2MarkdownGUI:
@@ -325,4 +374,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的程序使用进程池时需要
+    multiprocessing.freeze_support()
     main()
@@ -1,4 +1,10 @@
 __version__ = "0.1.1"
 
 from ._docx_to_markdown import docx_to_markdown
-from ._markdown_to_docx import markdown_to_docx
\ No newline at end of file
+from ._markdown_to_docx import markdown_to_docx
+from ._docx_writer import markdown_to_docx_streaming
+from ._batch import BatchRunner, BatchEvent, convert_file
+from ._watch import watch
+from ._archive import convert_archive
+from ._warnings import ConversionWarnings, ConversionError
+from ._limits import ResourceLimits, ResourceLimitExceeded
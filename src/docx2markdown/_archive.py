@@ -0,0 +1,218 @@
+import io
+import os
+import posixpath
+import re
+import tarfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, wait
+
+from ._batch import WorkerPool
+from ._warnings import ConversionWarnings
+
+OUTPUT_SUFFIXES = {"markdown": ".md", "text": ".txt", "ndjson": ".ndjson"}
+
+
+def convert_archive(input_archive, output_zip, mode="markdown", max_workers=None, strict=False, limits=None):
+    """
+    Convert every .docx file inside a zip or tar archive into an output zip.
+
+    Members are read one after the other from the input archive and
+    converted in worker processes without being extracted to disk. Only the
+    main process writes to `output_zip`, so the Markdown files and their
+    `.imgs/` folders are stored in it without temporary files. A member
+    that fails to convert, whose name points outside the archive root
+    (e.g. `../x.docx`), or whose output name was already used by an
+    earlier member (e.g. `docs/./a.docx` after `docs/a.docx`, or `x.DOCX`
+    after `x.docx`), is skipped and listed in the result. When a worker
+    process dies, the pool is replaced and the members that were
+    converting are retried once, each in its own process.
+
+    :param input_archive: Path of a .zip or .tar(.gz/.bz2/.xz) archive.
+    :param output_zip: Path of the zip file to write.
+    :param mode: "markdown", "text" or "ndjson", see `docx_to_markdown`.
+    :param max_workers: Number of worker processes (default: CPU count).
+    :param strict: Treat the first warning of a member as a failure.
+    :param limits: `ResourceLimits` applied to every member; a member
+        exceeding them fails on its own and the others are still converted.
+    :return: Dict with the "converted" member names, the "failed"
+        (member name, error message) pairs and the merged "warnings". Both
+        use the member names as stored in the input archive.
+    """
+    converted = []
+    failed = []
+    warnings = ConversionWarnings()
+    running = {}
+    output_names = set()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # 最多保持两倍进程数的成员在内存中
+    max_running = 2 * max_workers
+
+    members = iter_docx_members(input_archive, limits.max_total_size if limits else None)
+    with WorkerPool(max_workers) as pool, zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED) as output:
+
+        def submit(member, name, data, retried=False):
+            # 重试时使用单独的进程，再次崩溃时可以确定是这个成员
+            future = pool.submit(convert_member, name, data, mode, strict, limits, isolated=retried)
+            running[future] = (member, name, data, retried)
+
+        def submit_next():
+            for member, name, data, error in members:
+                if error is None:
+                    output_name = member_output_name(name, mode)
+                    if output_name in output_names:
+                        error = f"Duplicate output name {output_name}"
+                    output_names.add(output_name)
+                if error is not None:
+                    failed.append((member, error))
+                    continue
+                submit(member, name, data)
+                return True
+            return False
+
+        for _ in range(max_running):
+            if not submit_next():
+                break
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                member, name, data, retried = running.pop(future)
+                try:
+                    files, member_warnings = future.result()
+                except BrokenExecutor as e:
+                    if not retried:
+                        # 崩溃的也可能是同时转换的另一个成员，重试一次
+                        submit(member, name, data, retried=True)
+                        continue
+                    failed.append((member, str(e)))
+                except Exception as e:
+                    failed.append((member, str(e)))
+                else:
+                    for arcname, file_data in files:
+                        # 图片本身已经压缩过，直接存储
+                        is_image = "/.imgs/" in "/" + arcname
+                        output.writestr(arcname, file_data,
+                                        zipfile.ZIP_STORED if is_image else zipfile.ZIP_DEFLATED)
+                    converted.append(member)
+                    warnings.merge(member_warnings)
+                submit_next()
+
+    return {"converted": converted, "failed": failed, "warnings": warnings}
+
+
+def iter_docx_members(input_archive, max_size=None):
+    """
+    Yield (member name, normalized name, bytes, error) for each .docx file in an archive.
+
+    The member name is the name as stored in the archive and the normalized
+    name the one used for the output, see `safe_member_name`. Members that
+    must not be converted are not read; they are yielded with normalized
+    name and bytes None and the reason as error, otherwise error is None.
+
+    :param input_archive: Path of a .zip or .tar(.gz/.bz2/.xz) archive.
+    :param max_size: Members larger than this many bytes (as declared in
+        the archive) are skipped before they are inflated.
+    """
+    if zipfile.is_zipfile(input_archive):
+        with zipfile.ZipFile(input_archive) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and is_docx_member(info.filename):
+                    error = check_member(info.filename, info.file_size, max_size)
+                    if error is None:
+                        yield info.filename, safe_member_name(info.filename), archive.read(info), None
+                    else:
+                        yield info.filename, None, None, error
+    else:
+        # 流式读取，压缩的 tar 包也只需顺序解压一遍
+        with tarfile.open(input_archive, "r|*") as archive:
+            for info in archive:
+                if info.isfile() and is_docx_member(info.name):
+                    error = check_member(info.name, info.size, max_size)
+                    if error is None:
+                        yield info.name, safe_member_name(info.name), archive.extractfile(info).read(), None
+                    else:
+                        yield info.name, None, None, error
+
+
+def check_member(name, size, max_size=None):
+    """Return why a member must not be read, or None if it may be converted."""
+    if safe_member_name(name) is None:
+        return "Unsafe member name"
+    # 在解压之前根据归档中记录的大小拒绝过大的成员
+    if max_size is not None and size > max_size:
+        return f"Member is {size} bytes uncompressed, the limit is {max_size}"
+    return None
+
+
+def is_docx_member(name):
+    """Return True for .docx members, skipping Word lock files and macOS metadata."""
+    basename = posixpath.basename(name)
+    return (
+        name.lower().endswith(".docx")
+        and not basename.startswith(("~$", "._"))
+        and not name.startswith("__MACOSX/")
+    )
+
+
+def safe_member_name(name):
+    """
+    Return a member name normalized for use inside the output zip.
+
+    Backslashes become slashes and `.` components are removed. Returns None
+    for absolute names, drive letters and names leaving the archive root
+    through `..`, which would otherwise create traversal entries.
+    """
+    name = posixpath.normpath(name.replace("\\", "/"))
+    if name.startswith("/") or name == ".." or name.startswith("../") or re.match(r"[A-Za-z]:", name):
+        return None
+    return name
+
+
+def member_output_name(name, mode="markdown"):
+    """Return the name of the converted file of a member in the output zip."""
+    return posixpath.splitext(name)[0] + OUTPUT_SUFFIXES[mode]
+
+
+def convert_member(name, data, mode="markdown", strict=False, limits=None):
+    """
+    Convert one .docx member held in memory.
+
+    :param name: Name of the member inside the archive.
+    :param data: Content of the .docx file.
+    :param mode: "markdown", "text" or "ndjson".
+    :param strict: Raise `ConversionError` at the first warning.
+    :param limits: `ResourceLimits` to enforce, see `docx_to_markdown`.
+    :return: List of (name in output archive, bytes), the converted file
+        first and then its images, and the `ConversionWarnings`.
+    """
+    import docx
+    from ._docx_to_markdown import iter_blocks, save_images, unique_image_filename, write_blocks, write_text
+    from ._limits import Deadline
+
+    output_name = member_output_name(name, mode)
+    output_file = io.StringIO()
+    warnings = ConversionWarnings(strict=strict)
+    docx_file = io.BytesIO(data)
+    deadline = limits.check(docx_file, count_elements=mode != "text") if limits else Deadline()
+
+    if mode == "text":
+        write_text(docx_file, output_file, deadline, limits.max_elements if limits else None)
+        return [(output_name, output_file.getvalue().encode("utf-8"))], warnings
+
+    folder = posixpath.dirname(output_name)
+    image_folder = posixpath.join(folder, ".imgs", posixpath.splitext(posixpath.basename(output_name))[0])
+    image_files = []
+
+    def collect_image(image_part, output_folder):
+        image_path = posixpath.join(output_folder, unique_image_filename(image_part))
+        while any(image_path == path for path, _ in image_files):
+            image_path = posixpath.join(output_folder, unique_image_filename(image_part))
+        image_files.append((image_path, image_part.blob))
+        return {"path": image_path, "size": len(image_part.blob)}
+
+    doc = docx.Document(docx_file)
+    images = save_images(doc, image_folder, folder, save=collect_image)
+    write_blocks(iter_blocks(doc, images, warnings, deadline), output_file, mode)
+
+    return [(output_name, output_file.getvalue().encode("utf-8"))] + image_files, warnings
@@ -0,0 +1,208 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+BatchEvent = collections.namedtuple(
+    "BatchEvent",
+    ["kind", "path", "elapsed", "error", "completed", "total", "throughput", "eta"],
+)
+BatchEvent.__doc__ = """
+Progress message put on `BatchRunner.events`.
+
+`kind` is "done" or "failed" for a single file, and "finished" or
+"cancelled" once the whole batch is over. `elapsed` is the conversion time
+of that file in seconds, `throughput` is files per second since the batch
+started and `eta` the estimated seconds left.
+"""
+
+
+def convert_file(input_file, output_folder, conversion_type="docx2md", limits=None):
+    """
+    Convert one file into `output_folder` and return the time it took.
+
+    :param input_file: Path of the .docx or .md file to convert.
+    :param output_folder: Folder the converted file is written to.
+    :param conversion_type: "docx2md" or "md2docx".
+    :param limits: `ResourceLimits` applied to .docx input files.
+    :return: Conversion time in seconds.
+    """
+    from ._docx_to_markdown import docx_to_markdown
+    from ._markdown_to_docx import markdown_to_docx
+
+    start = time.perf_counter()
+    input_path = Path(input_file)
+    if conversion_type == "docx2md":
+        docx_to_markdown(str(input_path), str(Path(output_folder) / (input_path.stem + ".md")), limits=limits)
+    else:
+        markdown_to_docx(str(input_path), str(Path(output_folder) / (input_path.stem + ".docx")))
+    return time.perf_counter() - start
+
+
+class WorkerPool:
+    """
+    Executor that replaces itself once a worker process has died.
+
+    A dead worker (e.g. killed by the system for using too much memory)
+    breaks a `ProcessPoolExecutor` for good. `submit` then shuts the broken
+    executor down and submits to a new one, so the caller only has to deal
+    with the futures that were lost with it, typically by submitting them
+    again with `isolated=True`.
+
+    :param max_workers: Number of workers of the shared executor.
+    :param executor_class: `ProcessPoolExecutor` or `ThreadPoolExecutor`.
+    """
+
+    def __init__(self, max_workers, executor_class=ProcessPoolExecutor):
+        self.max_workers = max_workers
+        self.executor_class = executor_class
+        self.executor = executor_class(max_workers=max_workers)
+
+    def submit(self, fn, *args, isolated=False):
+        """
+        Schedule `fn(*args)` and return its future.
+
+        With `isolated=True` the call runs in a new single-use executor
+        instead. If its worker dies, only this future fails, so a task that
+        was running when the shared pool broke can be retried without
+        taking others down.
+        """
+        if isolated:
+            executor = self.executor_class(max_workers=1)
+            try:
+                return executor.submit(fn, *args)
+            finally:
+                # 已提交的任务仍会执行，完成后工作进程自行退出
+                executor.shutdown(wait=False)
+        try:
+            return self.executor.submit(fn, *args)
+        except BrokenExecutor:
+            # 工作进程意外退出（如被系统杀死）后进程池不可再用，换一个新的
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.executor_class(max_workers=self.max_workers)
+            return self.executor.submit(fn, *args)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class BatchRunner:
+    """
+    Convert a list of files on a worker pool and report progress via a queue.
+
+    The runner never touches any GUI object. A caller starts it, polls
+    `events` (e.g. with Tk's `after()`) and may call `cancel()` at any time;
+    files that have not started yet are then skipped. When a worker process
+    dies, the pool is replaced and the files that were converting are
+    retried once, each in its own process, so only the file that crashes
+    again is reported as failed.
+    """
+
+    def __init__(self, files, output_folder, conversion_type="docx2md", max_workers=1, use_processes=True,
+                 limits=None):
+        self.files = list(files)
+        self.output_folder = output_folder
+        self.conversion_type = conversion_type
+        self.max_workers = max(1, int(max_workers))
+        self.use_processes = use_processes
+        self.limits = limits
+        self.events = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Run the batch on a background thread and return immediately."""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop submitting new files; files already converting are finished."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        """Convert all files, blocking until done or cancelled."""
+        total = len(self.files)
+        completed = 0
+        started = time.perf_counter()
+        pending_files = collections.deque(self.files)
+        running = {}
+
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        try:
+            with WorkerPool(self.max_workers, executor_class) as pool:
+
+                def submit(input_file, retried=False):
+                    # 重试时使用单独的进程，再次崩溃时可以确定是这个文件
+                    future = pool.submit(convert_file, input_file, self.output_folder, self.conversion_type,
+                                         self.limits, isolated=retried)
+                    running[future] = (input_file, retried)
+
+                def submit_next():
+                    # 只保持与并发数相同的任务在队列中，取消时无需等待积压任务
+                    if self.cancelled or not pending_files:
+                        return False
+                    # 提交成功后才移出队列，提交失败的文件也会被记为失败
+                    submit(pending_files[0])
+                    pending_files.popleft()
+                    return True
+
+                for _ in range(self.max_workers):
+                    if not submit_next():
+                        break
+
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        input_file, retried = running.pop(future)
+                        error = future.exception()
+                        if isinstance(error, BrokenExecutor) and not retried:
+                            # 工作进程崩溃时，同时运行的文件都会失败，逐个单独重试一次
+                            submit(input_file, retried=True)
+                            continue
+
+                        completed += 1
+                        throughput, eta = self._rates(completed, total, started)
+                        if error is None:
+                            event = BatchEvent("done", input_file, future.result(), None, completed, total,
+                                               throughput, eta)
+                        else:
+                            event = BatchEvent("failed", input_file, None, error, completed, total, throughput, eta)
+                        self.events.put(event)
+
+                        submit_next()
+        except Exception as e:
+            # 意外错误（如无法创建新的进程池）时，剩余的文件全部记为失败
+            for input_file in [input_file for input_file, _ in running.values()] + list(pending_files):
+                completed += 1
+                throughput, eta = self._rates(completed, total, started)
+                self.events.put(BatchEvent("failed", input_file, None, e, completed, total, throughput, eta))
+        finally:
+            # 无论如何都发送结束事件，否则轮询的界面会一直等待
+            throughput, _ = self._rates(completed, total, started)
+            kind = "cancelled" if self.cancelled and completed < total else "finished"
+            self.events.put(
+                BatchEvent(kind, None, time.perf_counter() - started, None, completed, total, throughput, 0.0))
+
+    @staticmethod
+    def _rates(completed, total, started):
+        """Return (files per second, estimated seconds left)."""
+        wall_time = time.perf_counter() - started
+        throughput = completed / wall_time if wall_time > 0 else 0.0
+        eta = (total - completed) / throughput if throughput > 0 else 0.0
+        return throughput, eta
@@ -1,14 +1,73 @@
 import docx
 import os
+import json
 import re
 import uuid
 import time
 import random
+import zipfile
 from lxml import etree
 from pathlib import Path
 
-def docx_to_markdown(docx_file, output_md):
-    """Convert a .docx file to a Markdown file and a subfolder of images."""
+from ._limits import CHECK_INTERVAL, Deadline, ResourceLimitExceeded
+from ._warnings import ConversionWarnings
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_P = f"{{{W_NS}}}p"
+W_R = f"{{{W_NS}}}r"
+W_T = f"{{{W_NS}}}t"
+W_TAB = f"{{{W_NS}}}tab"
+W_BR = f"{{{W_NS}}}br"
+W_CR = f"{{{W_NS}}}cr"
+
+MODES = ("markdown", "text", "ndjson")
+
+def docx_to_markdown(docx_file, output_md, mode="markdown", split_level=None, strict=False, workers=None,
+                     limits=None):
+    """
+    Convert a .docx file to a Markdown file and a subfolder of images.
+
+    :param docx_file: Path of the .docx file (or a binary file object).
+    :param output_md: Path of the file to write.
+    :param mode: "markdown" (default), "text" or "ndjson". The "text" mode
+        writes plain text only, one line per paragraph, without extracting
+        images or resolving styles; see `docx_to_text`. The "ndjson" mode
+        writes one JSON object per block; see `write_ndjson`.
+    :param split_level: If given (1-3), write one Markdown file per section
+        starting at headings of this level or higher, and make `output_md`
+        an index linking to them; see `write_sections`.
+    :param strict: Raise `ConversionError` at the first warning instead of
+        collecting it.
+    :param workers: If greater than 1, convert the document body in this
+        many processes; the output is identical to the serial conversion.
+        Only supported in markdown mode without `split_level`; see
+        `write_markdown_parallel`.
+    :param limits: `ResourceLimits` to enforce. The package is checked
+        before it is loaded and `ResourceLimitExceeded` is raised as soon
+        as a limit is hit.
+    :return: `ConversionWarnings` with the problems found, e.g.
+        unsupported paragraph styles.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unsupported mode: {mode!r}. Use one of {', '.join(MODES)}.")
+    if split_level is not None and mode != "markdown":
+        raise ValueError("split_level is only supported in markdown mode.")
+    parallel = workers is not None and workers > 1
+    if parallel and (mode != "markdown" or split_level is not None):
+        raise ValueError("workers is only supported in markdown mode without split_level.")
+    warnings = ConversionWarnings(strict=strict)
+    # 在加载文档之前检查资源限制
+    deadline = limits.check(docx_file, count_elements=mode != "text") if limits else Deadline()
+    if mode == "text":
+        # 文本模式只读一遍 XML，在转换的同时计数
+        docx_to_text(docx_file, output_md, deadline, limits.max_elements if limits else None)
+        return warnings
+
+    if split_level is not None:
+        # 分章节模式直接从压缩包中流式读取正文，不加载整个文档
+        from ._split import write_sections
+        write_sections(docx_file, output_md, split_level, warnings, deadline)
+        return warnings
 
     folder = str(Path(output_md).parent)
     # 使用输出文件名（不含扩展名）作为图片文件夹名称
@@ -18,97 +77,274 @@ def docx_to_markdown(docx_file, output_md):
     
     doc = docx.Document(docx_file)
 
-    paragraphs = list(doc.paragraphs)
-    tables = list(doc.tables)
-    markdown = []
-    image_count = 0
-    text = ""
-
     # save all images
+    images = save_images(doc, image_folder, folder)
+
+    #print("images", images)
+
+    with open(output_md, "w", encoding="utf-8") as output_file:
+        if parallel:
+            from ._parallel import write_markdown_parallel
+            write_markdown_parallel(doc, images, output_file, workers, warnings, deadline)
+        else:
+            write_blocks(iter_blocks(doc, images, warnings, deadline), output_file, mode)
+
+    return warnings
+
+
+def save_images(doc, image_folder, folder, save=None):
+    """
+    Save all images of a document and return them by relationship id.
+
+    :param doc: The python-docx Document.
+    :param image_folder: Folder the image files are written to.
+    :param folder: Folder the returned paths are relative to.
+    :param save: Function called as save(image_part, image_folder) that
+        stores one image and returns {"path": ..., "size": ...}. Defaults
+        to `save_image`, which writes to disk.
+    :return: Dict mapping rId to {"path": relative path, "size": bytes}.
+    """
+    save = save or save_image
     images = {}
-    folder_path = Path(folder)
     for rel in doc.part.rels.values():
         if "image" in rel.reltype:
-            image_info = save_image(rel.target_part, image_folder)
-            # 存储相对路径（相对于输出文件夹）和大小信息
-            # 使用Path对象计算相对路径
-            full_image_path = Path(image_info["path"])
-            try:
-                relative_path = full_image_path.relative_to(folder_path)
-            except ValueError:
-                # 如果路径不在folder下，使用原始方式
-                relative_path = Path(image_info["path"][len(folder):].lstrip("/\\"))
-            images[rel.rId] = {
-                "path": str(relative_path).replace("\\", "/"),
-                "size": image_info["size"]
-            }
+            image_info = save(rel.target_part, image_folder)
+            images[rel.rId] = relative_image_info(image_info, folder)
+    return images
 
-    #print("images", images)
+
+def relative_image_info(image_info, folder):
+    """Make the path of a saved image relative to the output folder."""
+    # 存储相对路径（相对于输出文件夹）和大小信息
+    # 使用Path对象计算相对路径
+    full_image_path = Path(image_info["path"])
+    try:
+        relative_path = full_image_path.relative_to(Path(folder))
+    except ValueError:
+        # 如果路径不在folder下，使用原始方式
+        relative_path = Path(image_info["path"][len(folder):].lstrip("/\\"))
+    return {
+        "path": str(relative_path).replace("\\", "/"),
+        "size": image_info["size"]
+    }
+
+
+def iter_blocks(doc, images, warnings=None, deadline=None):
+    """
+    Go through the paragraphs and tables of a document in order.
+
+    Yields one dict per block with the keys "type" ("heading", "list_item",
+    "paragraph" or "table"), "index" (position among the paragraphs and
+    tables of the body), "style", "level" (heading or list level), "text"
+    (plain text; for tables one line per row with tab-separated cells),
+    "markdown" (the rendered Markdown), "cells" (table rows as lists of cell
+    texts) and "images" (paths of the referenced images, including images
+    inside table cells).
+    Problems are recorded in `warnings` (a `ConversionWarnings`). The
+    optional `deadline` is checked before each block and, within a block,
+    every `CHECK_INTERVAL` runs or table cells.
+    """
+    for index, block in enumerate(doc.iter_inner_content()):
+        yield convert_block(block, index, images, warnings, deadline)
+
+
+def convert_block(block, index, images, warnings=None, deadline=None):
+    """Convert one paragraph or table into a block dict (see `iter_blocks`)."""
+    if deadline is not None:
+        deadline.check()
+    if isinstance(block, docx.text.paragraph.Paragraph):  # Handle paragraphs
+        return convert_paragraph(block, index, images, warnings, deadline)
+
+    # Handle tables
+    cells = []
+    cell_count = 0
+    for row in block.rows:
+        row_cells = []
+        for cell in row.cells:
+            cell_count += 1
+            # 单个表格也可能非常大，按单元格数检查时间预算
+            if deadline is not None and cell_count % CHECK_INTERVAL == 0:
+                deadline.check()
+            row_cells.append(cell.text.strip())
+        cells.append(row_cells)
+    table_text = ""
+    for i, row in enumerate(cells):
+        table_text += "| " + " | ".join(row) + " |\n"
+        if i == 0:
+            table_text += "| " + " | ".join("---" for _ in row) + " |\n"
+
+    # 单元格中的图片不输出到 Markdown 表格，但仍在块信息中列出
+    image_rids = block._element.xpath(".//a:blip/@r:embed")
+    return {
+        "type": "table",
+        "index": index,
+        "style": None,
+        "level": None,
+        "text": "\n".join("\t".join(row) for row in cells),
+        "markdown": table_text,
+        "cells": cells,
+        "images": [images[rId]["path"] for rId in image_rids if rId in images],
+    }
+
+
+def convert_paragraph(paragraph, index, images, warnings=None, deadline=None):
+    """Convert one paragraph into a block dict (see `iter_blocks`)."""
+    if warnings is None:
+        warnings = ConversionWarnings()
+    md_paragraph = ""
+    block_type = "paragraph"
+    level = None
+
+    style_name = paragraph.style.name
+
+    # 先解析段落内容
+    paragraph_content = parse_run(paragraph, images, warnings, deadline)
+    if deadline is not None:
+        # paragraph.text 还会再遍历一遍所有 run
+        deadline.check()
     
-    for block in doc.element.body:
-        if block.tag.endswith('p'):  # Handle paragraphs
-            paragraph = paragraphs.pop(0)  # Match current paragraph
-            md_paragraph = ""
-
-            style_name = paragraph.style.name
-
-            # 先解析段落内容
-            paragraph_content = parse_run(paragraph, images)
-            
-            # 检查段落是否只包含图片或为空（没有文本内容）
-            # 如果内容去除图片标记后没有其他文本，则认为是纯图片段落或空段落
-            is_image_only_or_empty = False
-            if not paragraph_content.strip():
-                # 空段落
-                is_image_only_or_empty = True
-            else:
-                # 移除图片标记后检查是否还有文本
-                content_without_images = paragraph_content
-                # 移除HTML图片标签
-                content_without_images = re.sub(r'<img[^>]*>', '', content_without_images)
-                # 移除Markdown图片语法
-                content_without_images = re.sub(r'!\[.*?\]\(.*?\)', '', content_without_images)
-                # 如果去除图片后没有文本，则认为是纯图片段落
-                if not content_without_images.strip():
-                    is_image_only_or_empty = True
-
-            #print("Style:", style_name)
-            if "List" in style_name:
-                # 如果列表项为空或只有图片，不添加列表前缀
-                if not is_image_only_or_empty:
-                    prefix = get_bullet_point_prefix(paragraph)
-                    md_paragraph = prefix  # Markdown syntax for bullet points
-            elif "Heading 1" in style_name:
-                md_paragraph = "# "
-            elif "Heading 2" in style_name:
-                md_paragraph = "## "
-            elif "Heading 3" in style_name:
-                md_paragraph = "### "
-            elif "Normal" in style_name:
-                md_paragraph = ""
-            else:
-                print("Unsupported style:", style_name)
+    # 检查段落是否只包含图片或为空（没有文本内容）
+    # 如果内容去除图片标记后没有其他文本，则认为是纯图片段落或空段落
+    is_image_only_or_empty = False
+    if not paragraph_content.strip():
+        # 空段落
+        is_image_only_or_empty = True
+    else:
+        # 移除图片标记后检查是否还有文本
+        content_without_images = paragraph_content
+        # 移除HTML图片标签
+        content_without_images = re.sub(r'<img[^>]*>', '', content_without_images)
+        # 移除Markdown图片语法
+        content_without_images = re.sub(r'!\[.*?\]\(.*?\)', '', content_without_images)
+        # 如果去除图片后没有文本，则认为是纯图片段落
+        if not content_without_images.strip():
+            is_image_only_or_empty = True
+
+    #print("Style:", style_name)
+    if "List" in style_name:
+        block_type = "list_item"
+        level = get_list_level(paragraph)
+        # 如果列表项为空或只有图片，不添加列表前缀
+        if not is_image_only_or_empty:
+            prefix = get_bullet_point_prefix(paragraph)
+            md_paragraph = prefix  # Markdown syntax for bullet points
+    elif get_heading_level(style_name):
+        block_type, level = "heading", get_heading_level(style_name)
+        md_paragraph = "#" * level + " "
+    elif "Normal" in style_name:
+        md_paragraph = ""
+    else:
+        warnings.warn("unsupported_style", style_name)
 
-            md_paragraph += paragraph_content
+    md_paragraph += paragraph_content
+
+    image_rids = paragraph._element.xpath(".//a:blip/@r:embed")
+    return {
+        "type": block_type,
+        "index": index,
+        "style": style_name,
+        "level": level,
+        "text": paragraph.text,
+        "markdown": md_paragraph,
+        "cells": None,
+        "images": [images[rId]["path"] for rId in image_rids if rId in images],
+    }
+
+
+def get_heading_level(style_name):
+    """Return the Markdown heading level (1-3) of a paragraph style, or None."""
+    for level in (1, 2, 3):
+        if f"Heading {level}" in style_name:
+            return level
+    return None
+
+
+def write_blocks(blocks, output_file, mode="markdown"):
+    """Write blocks to an open text file in the format of `mode`."""
+    if mode == "ndjson":
+        write_ndjson(blocks, output_file)
+    else:
+        write_markdown(blocks, output_file)
+
+
+def write_markdown(blocks, md_file):
+    """Write blocks to an open text file, separated by blank lines."""
+    for i, block in enumerate(blocks):
+        if i:
+            md_file.write("\n\n")
+        md_file.write(block["markdown"])
+
+
+def write_ndjson(blocks, ndjson_file):
+    """
+    Write blocks to an open text file as newline-delimited JSON.
+
+    Each line is the block dict from `iter_blocks` plus "heading_path", the
+    texts of the enclosing headings (including the block itself when it is
+    a heading), so chunkers can use the document structure directly.
+    """
+    heading_path = []  # (level, text)
+    for block in blocks:
+        if block["type"] == "heading":
+            while heading_path and heading_path[-1][0] >= block["level"]:
+                heading_path.pop()
+            heading_path.append((block["level"], block["text"]))
+        record = dict(block, heading_path=[text for _, text in heading_path])
+        ndjson_file.write(json.dumps(record, ensure_ascii=False))
+        ndjson_file.write("\n")
+
+
+def docx_to_text(docx_file, output_txt, deadline=None, max_elements=None):
+    """
+    Extract the plain text of a .docx file, one line per paragraph.
+
+    `word/document.xml` is streamed with `iterparse` straight from the zip
+    package and every element is cleared once handled, so memory does not
+    grow with the document, not even within one paragraph. Images,
+    relationships and styles are never touched, which makes this much
+    faster than the Markdown conversion.
+
+    :param docx_file: Path of the .docx file (or a binary file object).
+    :param output_txt: Path of the text file to write.
+    :param deadline: Optional `Deadline` checked every `CHECK_INTERVAL`
+        elements.
+    :param max_elements: Optional limit on the number of XML elements;
+        `ResourceLimitExceeded` is raised as soon as it is passed.
+    :return: None
+    """
+    with open(output_txt, "w", encoding="utf-8") as txt_file:
+        write_text(docx_file, txt_file, deadline, max_elements)
 
-            markdown.append(md_paragraph)
 
-        elif block.tag.endswith('tbl'):  # Handle tables (if present)
-            table = tables.pop(0)  # Match current table
-            table_text = ""
-            for i, row in enumerate(table.rows):
-                table_text += "| " + " | ".join(cell.text.strip() for cell in row.cells) + " |\n"
-                if i == 0:
-                    table_text += "| " + " | ".join("---" for _ in row.cells) + " |\n"
-                    
-            markdown.append(table_text)
-            
-        #else:
-        #    print("Unsupported block:", block)
+def write_text(docx_file, txt_file, deadline=None, max_elements=None):
+    """Stream the plain text of a .docx file into an open text file."""
+    with zipfile.ZipFile(docx_file) as package, package.open("word/document.xml") as document_xml:
+        text = []
+        count = 0
+        for _, element in etree.iterparse(document_xml, events=("end",)):
+            count += 1
+            if max_elements is not None and count > max_elements:
+                raise ResourceLimitExceeded(f"word/document.xml has more than {max_elements} elements")
+            if deadline is not None and count % CHECK_INTERVAL == 0:
+                deadline.check()
 
-    # Write to Markdown file
-    with open(output_md, "w", encoding="utf-8") as md_file:
-        md_file.write("\n\n".join(markdown))
+            tag = element.tag
+            if tag == W_T:
+                text.append(element.text or "")
+            elif tag == W_TAB:
+                # w:pPr/w:tabs 中的制表位定义不是文本
+                if element.getparent().tag == W_R:
+                    text.append("\t")
+            elif tag == W_BR or tag == W_CR:
+                text.append("\n")
+            elif tag == W_P:
+                txt_file.write("".join(text))
+                txt_file.write("\n")
+                text = []
+            # 释放已处理的节点及其之前的兄弟节点，段落内大量的 w:r 也不会累积
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
 
 
 def extract_r_embed(xml_string):
@@ -140,6 +376,18 @@ def save_image(image_part, output_folder):
     """Save an image to the output folder and return the filename and size."""
     os.makedirs(output_folder, exist_ok=True)
     
+    image_filename = os.path.join(output_folder, unique_image_filename(image_part))
+    
+    with open(image_filename, "wb") as img_file:
+        img_file.write(image_part.blob)
+    # 获取图片大小（字节数）
+    image_size = len(image_part.blob)
+    image_path = str(image_filename).replace("\\", "/")
+    return {"path": image_path, "size": image_size}
+
+
+def unique_image_filename(image_part):
+    """Return a short unique file name keeping the extension of the image part."""
     # 获取原始文件扩展名
     original_name = os.path.basename(image_part.partname)
     original_ext = Path(original_name).suffix
@@ -151,15 +399,7 @@ def save_image(image_part, output_folder):
     # 总共10位，比UUID的32位短很多，且足够唯一
     timestamp_hex = format(int(time.time() * 100) & 0xFFFFFF, '06x')  # 6位时间戳（毫秒级）
     random_hex = format(random.randint(0, 0xFFFF), '04x')  # 4位随机数
-    unique_filename = f"{timestamp_hex}{random_hex}{original_ext}"
-    image_filename = os.path.join(output_folder, unique_filename)
-    
-    with open(image_filename, "wb") as img_file:
-        img_file.write(image_part.blob)
-    # 获取图片大小（字节数）
-    image_size = len(image_part.blob)
-    image_path = str(image_filename).replace("\\", "/")
-    return {"path": image_path, "size": image_size}
+    return f"{timestamp_hex}{random_hex}{original_ext}"
 
 
 def get_list_level(paragraph):
@@ -178,15 +418,21 @@ def get_bullet_point_prefix(paragraph):
     level = get_list_level(paragraph)
     return "  " * level + "- "  # Use Markdown syntax for nested lists
     
-def parse_run(run, images):
-    """Go through document objects recursively and return markdown."""
-    sub_parts = list(run.iter_inner_content())
+def parse_run(run, images, warnings=None, deadline=None):
+    """
+    Go through document objects recursively and return markdown.
+
+    The optional `deadline` is checked every `CHECK_INTERVAL` parts, so a
+    paragraph with millions of (empty) runs still stops within its budget.
+    """
     text = ""
-    for s in sub_parts:
+    for i, s in enumerate(run.iter_inner_content(), 1):
+        if deadline is not None and i % CHECK_INTERVAL == 0:
+            deadline.check()
         if isinstance(s, str):
             text += s
         elif isinstance(s, docx.text.run.Run):
-            text += parse_run(s, images)
+            text += parse_run(s, images, warnings, deadline)
         elif isinstance(s, docx.text.hyperlink.Hyperlink):
             text += f"[{s.text}]({s.address})"
         elif isinstance(s, docx.drawing.Drawing):
@@ -201,7 +447,8 @@ def parse_run(run, images):
                 # 大于等于20KB的图片使用Markdown格式
                 text += f"![](./{image_path})"
         else:
-            print("unknown run type", s)
+            if warnings is not None:
+                warnings.warn("unknown_run_type", type(s).__name__)
 
     if isinstance(run, docx.text.run.Run):
         if run.bold:
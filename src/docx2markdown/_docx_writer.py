@@ -0,0 +1,315 @@
+import json
+import os
+import re
+import tempfile
+import zipfile
+from pathlib import Path
+
+import docx
+from docx.image.image import Image
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.oxml.shape import CT_Inline
+from docx.oxml.table import CT_Tbl
+from docx.shared import Emu, Inches
+from lxml import etree
+
+from ._markdown_to_docx import iter_markdown_blocks, resolve_image_path
+
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+RT_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+RT_HYPERLINK = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+# 预先声明常见图片类型，使 [Content_Types].xml 可以在正文之前写出
+IMAGE_CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+    "tif": "image/tiff",
+    "tiff": "image/tiff",
+    "emf": "image/x-emf",
+    "wmf": "image/x-wmf",
+}
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+
+# 关系记录超过该大小后写入临时文件
+RELATIONSHIPS_SPOOL_SIZE = 1024 * 1024
+
+
+def markdown_to_docx_streaming(markdown_file, output_docx):
+    """
+    Convert a Markdown file to a .docx file in bounded memory.
+
+    Unlike `markdown_to_docx`, no python-docx object tree is built. The
+    Markdown file is read line by line and every block is written to
+    `word/document.xml` inside the output zip as soon as it is parsed.
+    Relationships are recorded in a temporary file as they are created (one
+    per link, duplicate targets included, and one per distinct image) and
+    images are copied from disk, so memory is bounded by one block and the
+    largest image rather than by the size of the input. The only state that
+    grows is a path and part name per distinct image, used to embed each
+    image once.
+
+    :param markdown_file: Path of the Markdown file to read.
+    :param output_docx: Path of the .docx file to write.
+    :return: None
+    """
+    md_file_dir = Path(markdown_file).parent
+
+    with zipfile.ZipFile(output_docx, "w", zipfile.ZIP_DEFLATED) as package, \
+            open(markdown_file, "r", encoding="utf-8") as md_file:
+        with StreamingDocxWriter(package) as writer:
+            writer.write_document(iter_markdown_blocks(md_file), md_file_dir)
+
+
+class StreamingDocxWriter:
+    """
+    Write a WordprocessingML package into an open zip file block by block.
+
+    The writer holds the template zip and a temporary relationships file
+    open; use it as a context manager (or call `close`) so they are released
+    even when writing fails.
+    """
+
+    def __init__(self, package, template=DEFAULT_TEMPLATE):
+        self.package = package
+        # 每行一条 JSON 记录 [rId, type, target, is_external]，最后再写成 XML
+        self.relationships = tempfile.SpooledTemporaryFile(RELATIONSHIPS_SPOOL_SIZE, mode="w+", encoding="utf-8")
+        # 同一张图片只嵌入一次；每张不同的图片占用一条记录，链接则不做去重以免内存随输入增长
+        self.media = []  # (image_path, partname)
+        self.image_rids = {}
+        self.shape_id = 0
+
+        self.template = zipfile.ZipFile(template)
+        try:
+            template_rels = etree.fromstring(self.template.read("word/_rels/document.xml.rels"))
+            self.template_rels = template_rels
+            self.next_rid = 1 + max(
+                int(rel.get("Id")[3:]) for rel in template_rels if rel.get("Id", "").startswith("rId")
+            )
+
+            template_document = etree.fromstring(self.template.read("word/document.xml"))
+            self.nsmap = template_document.nsmap
+            self.sectPr = template_document.find(qn("w:body")).find(qn("w:sectPr"))
+            self.block_width = self._block_width()
+        except BaseException:
+            self.close()
+            raise
+
+    def write_document(self, blocks, md_file_dir):
+        """Stream `blocks` into the package and finish it."""
+        self._copy_template_parts()
+
+        with self.package.open("word/document.xml", "w", force_zip64=True) as fh:
+            with etree.xmlfile(fh, encoding="UTF-8") as xf:
+                xf.write_declaration(standalone=True)
+                with xf.element(qn("w:document"), nsmap=self.nsmap):
+                    with xf.element(qn("w:body")):
+                        for kind, *args in blocks:
+                            for element in self.render_block(kind, args, md_file_dir):
+                                xf.write(element)
+                                xf.flush()
+                        xf.write(self.sectPr)
+
+        self._write_relationships()
+        self._write_media()
+
+    def close(self):
+        """Close the template zip and the temporary relationships file."""
+        self.relationships.close()
+        self.template.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def render_block(self, kind, args, md_file_dir):
+        """Return the body elements for one block from `iter_markdown_blocks`."""
+        if kind == "table":
+            return [self.table(args[0])]
+        elif kind == "heading":
+            text, level = args
+            return [self.paragraph(text, style=f"Heading{level}")]
+        elif kind == "bullet":
+            text, level = args
+            return [self.bullet_point(text, level)]
+        elif kind == "numbered":
+            return [self.paragraph(args[0], style="ListNumber")]
+        elif kind == "image":
+            alt_text, image_path = args
+            image_path = resolve_image_path(image_path, md_file_dir)
+            if image_path and os.path.exists(image_path):
+                try:
+                    return [self.picture(image_path)]
+                except Exception as e:
+                    return [self.paragraph(f"[Image error: {alt_text} - {str(e)}]")]
+            return [self.paragraph(f"[Image not found: {alt_text}]")]
+        elif kind == "html_image":
+            image_path = resolve_image_path(args[0], md_file_dir)
+            if image_path and os.path.exists(image_path):
+                try:
+                    return [self.picture(image_path)]
+                except Exception as e:
+                    return [self.paragraph(f"[Image error: {str(e)}]")]
+            return [self.paragraph(f"[Image not found: {image_path}]")]
+        elif kind == "links":
+            return [self.paragraph_with_links(args[0])]
+        elif kind == "formatted":
+            return [self.formatted_paragraph(args[0])]
+        return [self.paragraph(args[0])]
+
+    def paragraph(self, text="", style=None):
+        """Create a `w:p` element containing a single run of `text`."""
+        p = OxmlElement("w:p")
+        if style is not None:
+            p.style = style
+        if text:
+            p.add_r().text = text
+        return p
+
+    def bullet_point(self, text, level):
+        """Create a "List Bullet" paragraph at the given numbering level."""
+        p = self.paragraph(text, style="ListBullet")
+        numPr = p.get_or_add_pPr().get_or_add_numPr()
+        numPr.get_or_add_ilvl().val = level
+        numPr.get_or_add_numId().val = 1  # Use numbering ID 1 (default for List Bullet)
+        return p
+
+    def formatted_paragraph(self, line):
+        """Create a paragraph with bold (**text**) and italic (*text*) runs."""
+        p = OxmlElement("w:p")
+        for part in re.split(r"(\*\*.*?\*\*|\*.*?\*)", line):
+            if part.startswith("**") and part.endswith("**"):
+                r = p.add_r()
+                r.text = part[2:-2]
+                r.get_or_add_rPr()._add_b()
+            elif part.startswith("*") and part.endswith("*"):
+                r = p.add_r()
+                r.text = part[1:-1]
+                r.get_or_add_rPr()._add_i()
+            else:
+                p.add_r().text = part
+        return p
+
+    def paragraph_with_links(self, line):
+        """Create a paragraph for a line containing [text](url) hyperlinks."""
+        p = OxmlElement("w:p")
+        cursor = 0
+        for match in re.finditer(r"\[(.*?)\]\((.*?)\)", line):
+            start, end = match.span()
+            if cursor < start:
+                p.add_r().text = line[cursor:start]
+
+            hyperlink = OxmlElement("w:hyperlink")
+            hyperlink.set(qn("r:id"), self.relate_to(match.group(2), RT_HYPERLINK, is_external=True))
+            run = OxmlElement("w:r")
+            text_element = OxmlElement("w:t")
+            text_element.text = match.group(1)
+            run.append(text_element)
+            hyperlink.append(run)
+            p.append(hyperlink)
+
+            cursor = end
+        if cursor < len(line):
+            p.add_r().text = line[cursor:]
+        return p
+
+    def table(self, table_lines):
+        """Create a "Table Grid" table from Markdown table lines."""
+        headers = table_lines[0].split("|")[1:-1]
+        rows = [headers] + [row.split("|")[1:-1] for row in table_lines[1:]]
+
+        tbl = CT_Tbl.new_tbl(len(rows), len(headers), self.block_width)
+        tbl.tblStyle_val = "TableGrid"
+        for tr, row in zip(tbl.tr_lst, rows):
+            for tc, cell in zip(tr.tc_lst, row):
+                text = cell.strip()
+                if text:
+                    tc.p_lst[0].add_r().text = text
+        return tbl
+
+    def picture(self, image_path):
+        """Create a paragraph holding an inline picture 3 inches wide."""
+        rId = self.image_rids.get(image_path)
+        image = Image.from_file(image_path)
+        if rId is None:
+            partname = f"word/media/image{len(self.media) + 1}.{image.ext}"
+            rId = self.relate_to("media/" + Path(partname).name, RT_IMAGE)
+            self.media.append((image_path, partname))
+            self.image_rids[image_path] = rId
+
+        cx, cy = image.scaled_dimensions(Inches(3.0), None)
+        self.shape_id += 1
+        inline = CT_Inline.new_pic_inline(self.shape_id, rId, image.filename, cx, cy)
+
+        p = OxmlElement("w:p")
+        drawing = OxmlElement("w:drawing")
+        drawing.append(inline)
+        p.add_r().append(drawing)
+        return p
+
+    def relate_to(self, target, reltype, is_external=False):
+        """Record a relationship from the document part and return its rId."""
+        rId = f"rId{self.next_rid}"
+        self.next_rid += 1
+        self.relationships.write(json.dumps([rId, reltype, target, is_external]) + "\n")
+        return rId
+
+    def _block_width(self):
+        """Space between the page margins, as python-docx uses for new tables."""
+        pgSz = self.sectPr.find(qn("w:pgSz"))
+        pgMar = self.sectPr.find(qn("w:pgMar"))
+        page_width = int(pgSz.get(qn("w:w")))
+        margins = int(pgMar.get(qn("w:left"))) + int(pgMar.get(qn("w:right")))
+        return Emu((page_width - margins) * 635)  # 1 twip = 635 EMU
+
+    def _copy_template_parts(self):
+        """Write the content types and every template part except the main document."""
+        content_types = etree.fromstring(self.template.read("[Content_Types].xml"))
+        declared = {d.get("Extension").lower() for d in content_types if d.get("Extension")}
+        for ext, content_type in IMAGE_CONTENT_TYPES.items():
+            if ext not in declared:
+                default = etree.Element(f"{{{CONTENT_TYPES_NS}}}Default")
+                default.set("Extension", ext)
+                default.set("ContentType", content_type)
+                content_types.insert(0, default)
+        self.package.writestr("[Content_Types].xml", _serialize(content_types))
+
+        for info in self.template.infolist():
+            if info.filename in ("[Content_Types].xml", "word/document.xml", "word/_rels/document.xml.rels"):
+                continue
+            self.package.writestr(info.filename, self.template.read(info.filename))
+
+    def _write_relationships(self):
+        """Stream `word/_rels/document.xml.rels` with the template and new relationships."""
+        self.relationships.seek(0)
+        with self.package.open("word/_rels/document.xml.rels", "w", force_zip64=True) as fh:
+            with etree.xmlfile(fh, encoding="UTF-8") as xf:
+                xf.write_declaration(standalone=True)
+                with xf.element(self.template_rels.tag, nsmap=self.template_rels.nsmap):
+                    # 逐条写出，避免在内存中构建整个关系树
+                    for rel in self.template_rels:
+                        with xf.element(rel.tag, rel.attrib):
+                            pass
+                    for line in self.relationships:
+                        rId, reltype, target, is_external = json.loads(line)
+                        attributes = {"Id": rId, "Type": reltype, "Target": target}
+                        if is_external:
+                            attributes["TargetMode"] = "External"
+                        with xf.element(f"{{{RELATIONSHIPS_NS}}}Relationship", attributes):
+                            pass
+
+    def _write_media(self):
+        """Copy the embedded images into `word/media/` straight from disk."""
+        for image_path, partname in self.media:
+            self.package.write(image_path, partname)
+
+
+def _serialize(element):
+    return etree.tostring(element, xml_declaration=True, encoding="UTF-8", standalone=True)
@@ -0,0 +1,118 @@
+import time
+import zipfile
+
+from lxml import etree
+
+from ._warnings import ConversionError
+
+MB = 1024 * 1024
+
+# 流式解析时每处理这么多个元素检查一次时间预算
+CHECK_INTERVAL = 10000
+
+
+class ResourceLimitExceeded(ConversionError):
+    """Raised when a document exceeds one of its `ResourceLimits`."""
+
+
+class ResourceLimits:
+    """
+    Upper bounds for the resources a single document may use.
+
+    The package limits are checked from the zip central directory before
+    anything is inflated, and the element count is checked by streaming
+    `word/document.xml` once before python-docx builds its object tree (the
+    text mode counts while it streams instead), so zip bombs and documents
+    with millions of empty runs are rejected cheaply. The time budget is
+    checked before each block and every `CHECK_INTERVAL` runs or table
+    cells within a block while converting (in the worker processes too),
+    and every `CHECK_INTERVAL` elements while streaming.
+    Any limit set to None is not enforced.
+
+    :param max_total_size: Total uncompressed size of all parts in bytes.
+    :param max_part_size: Uncompressed size of any single part in bytes.
+    :param max_elements: Number of XML elements in `word/document.xml`.
+    :param max_images: Number of files in `word/media/`.
+    :param time_budget: Wall-clock seconds per document.
+    """
+
+    def __init__(self, max_total_size=500 * MB, max_part_size=200 * MB, max_elements=5_000_000,
+                 max_images=5000, time_budget=None):
+        self.max_total_size = max_total_size
+        self.max_part_size = max_part_size
+        self.max_elements = max_elements
+        self.max_images = max_images
+        self.time_budget = time_budget
+
+    def check(self, docx_file, count_elements=True):
+        """
+        Check a .docx file against the package and element limits.
+
+        :param docx_file: Path of the .docx file or a seekable binary file.
+        :param count_elements: Set to False to skip the element count when
+            the caller counts the elements while streaming the document,
+            as the text mode does.
+        :return: `Deadline` for the rest of the conversion, started before
+            the checks so they count against the time budget.
+        """
+        deadline = Deadline(self.time_budget)
+        with zipfile.ZipFile(docx_file) as package:
+            self.check_package(package)
+            if count_elements:
+                self.check_elements(package, deadline)
+        if hasattr(docx_file, "seek"):
+            docx_file.seek(0)
+        return deadline
+
+    def check_package(self, package):
+        """Check part sizes and image count using the zip directory only."""
+        total_size = 0
+        image_count = 0
+        for info in package.infolist():
+            if self.max_part_size is not None and info.file_size > self.max_part_size:
+                raise ResourceLimitExceeded(
+                    f"Part {info.filename} is {info.file_size} bytes uncompressed, "
+                    f"the limit is {self.max_part_size}"
+                )
+            total_size += info.file_size
+            if info.filename.startswith("word/media/"):
+                image_count += 1
+
+        if self.max_total_size is not None and total_size > self.max_total_size:
+            raise ResourceLimitExceeded(
+                f"Package is {total_size} bytes uncompressed, the limit is {self.max_total_size}"
+            )
+        if self.max_images is not None and image_count > self.max_images:
+            raise ResourceLimitExceeded(f"Package contains {image_count} images, the limit is {self.max_images}")
+
+    def check_elements(self, package, deadline=None):
+        """Count the elements of `word/document.xml` without keeping them."""
+        if self.max_elements is None:
+            return
+        count = 0
+        with package.open("word/document.xml") as document_xml:
+            for _, element in etree.iterparse(document_xml, events=("end",)):
+                count += 1
+                if count > self.max_elements:
+                    raise ResourceLimitExceeded(
+                        f"word/document.xml has more than {self.max_elements} elements"
+                    )
+                # 只计数，不保留已解析的节点
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+                if deadline is not None and count % CHECK_INTERVAL == 0:
+                    deadline.check()
+
+
+class Deadline:
+    """Wall-clock budget of one conversion; None means unlimited."""
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.end = time.monotonic() + seconds if seconds is not None else None
+
+    def check(self):
+        """Raise `ResourceLimitExceeded` once the budget is used up."""
+        if self.end is not None and time.monotonic() > self.end:
+            raise ResourceLimitExceeded(f"Time budget of {self.seconds}s exceeded")
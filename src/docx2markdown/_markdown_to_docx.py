@@ -17,6 +17,80 @@ def markdown_to_docx(markdown_file, output_docx):
     with open(markdown_file, "r", encoding="utf-8") as md_file:
         lines = md_file.readlines()
 
+    for kind, *args in iter_markdown_blocks(lines):
+        if kind == "table":
+            add_table(doc, args[0])  # Add the parsed table to the document
+
+        # Headings
+        elif kind == "heading":
+            text, heading_level = args
+            doc.add_heading(text, level=heading_level)
+
+        # Multi-level bullet points
+        elif kind == "bullet":
+            text, indent_level = args
+            add_bullet_point(doc, text, level=indent_level)
+
+        # Numbered lists
+        elif kind == "numbered":
+            doc.add_paragraph(args[0], style="List Number")
+
+        # Images - Markdown format: ![alt text](image_path)
+        elif kind == "image":
+            alt_text, image_path = args
+            # 处理相对路径
+            image_path = resolve_image_path(image_path, md_file_dir)
+            
+            if image_path and os.path.exists(image_path):
+                try:
+                    doc.add_picture(image_path, width=Inches(3.0))
+                except Exception as e:
+                    doc.add_paragraph(f"[Image error: {alt_text} - {str(e)}]")
+            else:
+                doc.add_paragraph(f"[Image not found: {alt_text}]")
+        
+        # Images - HTML format: <img src="..." class="icon" />
+        elif kind == "html_image":
+            image_path = args[0]
+            # 处理相对路径
+            image_path = resolve_image_path(image_path, md_file_dir)
+            
+            if image_path and os.path.exists(image_path):
+                try:
+                    doc.add_picture(image_path, width=Inches(3.0))
+                except Exception as e:
+                    doc.add_paragraph(f"[Image error: {str(e)}]")
+            else:
+                doc.add_paragraph(f"[Image not found: {image_path}]")
+
+        # Links (e.g., [text](url))
+        elif kind == "links":
+            process_line_with_links(doc, args[0])
+
+        # Bold and Italic formatting
+        elif kind == "formatted":
+            parse_and_add_text_with_formatting(doc, args[0])
+
+        # Plain text
+        else:
+            doc.add_paragraph(args[0])
+
+    # Save the document
+    doc.save(output_docx)
+
+
+def iter_markdown_blocks(lines):
+    """
+    Classify Markdown lines into the blocks understood by the converters.
+
+    Yields tuples whose first item is the block kind ("table", "heading",
+    "bullet", "numbered", "image", "html_image", "links", "formatted" or
+    "text") followed by the arguments needed to render it. `lines` may be
+    any iterable, so a file object is consumed lazily line by line.
+
+    :param lines: Iterable of Markdown lines.
+    :return: Generator of block tuples.
+    """
     table_buffer = []  # To collect table lines
     in_table = False  # Flag for table parsing
 
@@ -32,7 +106,7 @@ def markdown_to_docx(markdown_file, output_docx):
         elif in_table and "---" in line:
             continue  # Ignore separator row
         elif in_table and line.strip() == "":
-            add_table(doc, table_buffer)  # Add the parsed table to the document
+            yield ("table", table_buffer)
             table_buffer = []  # Reset buffer
             in_table = False
             continue
@@ -41,66 +115,43 @@ def markdown_to_docx(markdown_file, output_docx):
         if line.startswith("#"):
             heading_level = len(line.split(" ", 1)[0])  # Number of # indicates heading level
             text = line.lstrip("#").strip()
-            doc.add_heading(text, level=min(heading_level, 5))
+            yield ("heading", text, min(heading_level, 5))
 
         # Multi-level bullet points
         elif re.match(r"^(\s*)[-*]\s", line):
             indent_level = len(re.match(r"^(\s*)", line).group(1)) // 2
             text = line.strip("-* ").strip()
-            add_bullet_point(doc, text, level=indent_level)
+            yield ("bullet", text, indent_level)
 
         # Numbered lists
         elif re.match(r"^\d+\.\s", line):
-            text = line.split(". ", 1)[1]
-            doc.add_paragraph(text, style="List Number")
+            yield ("numbered", line.split(". ", 1)[1])
 
         # Images - Markdown format: ![alt text](image_path)
         elif line.startswith("![") and "](" in line:
             alt_text = re.search(r"!\[(.*?)\]", line).group(1)
             image_path = re.search(r"\((.*?)\)", line).group(1)
-            # 处理相对路径
-            image_path = resolve_image_path(image_path, md_file_dir)
-            
-            if image_path and os.path.exists(image_path):
-                try:
-                    doc.add_picture(image_path, width=Inches(3.0))
-                except Exception as e:
-                    doc.add_paragraph(f"[Image error: {alt_text} - {str(e)}]")
-            else:
-                doc.add_paragraph(f"[Image not found: {alt_text}]")
-        
+            yield ("image", alt_text, image_path)
+
         # Images - HTML format: <img src="..." class="icon" />
         elif "<img" in line and "src=" in line:
             # 提取图片路径
             img_match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', line)
             if img_match:
-                image_path = img_match.group(1)
-                # 处理相对路径
-                image_path = resolve_image_path(image_path, md_file_dir)
-                
-                if image_path and os.path.exists(image_path):
-                    try:
-                        doc.add_picture(image_path, width=Inches(3.0))
-                    except Exception as e:
-                        doc.add_paragraph(f"[Image error: {str(e)}]")
-                else:
-                    doc.add_paragraph(f"[Image not found: {image_path}]")
+                yield ("html_image", img_match.group(1))
 
         # Links (e.g., [text](url))
         elif "[" in line and "](" in line:
-            process_line_with_links(doc, line)
+            yield ("links", line)
 
         # Bold and Italic formatting
         elif "**" in line or "*" in line:
-            parse_and_add_text_with_formatting(doc, line)
+            yield ("formatted", line)
 
         # Plain text
         else:
             if line:
-                doc.add_paragraph(line)
-
-    # Save the document
-    doc.save(output_docx)
+                yield ("text", line)
 
 
 def add_hyperlink(paragraph, url, text):
@@ -0,0 +1,199 @@
+import collections
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.styles.styles import Styles
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from ._docx_to_markdown import convert_block
+from ._warnings import ConversionWarnings
+
+# 每个进程负责的块数，块越多负载越均衡，但序列化开销越大
+CHUNKS_PER_WORKER = 4
+
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def write_markdown_parallel(doc, images, md_file, workers, warnings=None, deadline=None):
+    """
+    Convert the body of a document in worker processes and write Markdown.
+
+    The paragraphs and tables of the body are split into contiguous chunks
+    that are serialized to XML and converted in `workers` processes. The
+    style names, hyperlink targets and image map of the document are sent
+    to each process once. Chunk results are written in order, so the
+    output is identical to `write_markdown(iter_blocks(doc, images), ...)`.
+
+    :param doc: The python-docx Document.
+    :param images: Image map as returned by `save_images`.
+    :param md_file: Open text file the Markdown is written to.
+    :param workers: Number of worker processes. With 1, the chunks are
+        converted in the current process without a pool, which is the
+        single-worker baseline of this code path.
+    :param warnings: `ConversionWarnings` receiving the problems found.
+    :param deadline: Optional `Deadline` checked before every chunk and,
+        in the workers, within every block (see `iter_blocks`); when it is
+        exceeded, chunks not yet started are cancelled.
+    :return: None
+    """
+    warnings = warnings if warnings is not None else ConversionWarnings()
+    elements = doc.element.body.xpath("./w:p | ./w:tbl")
+    chunk_size = max(1, -(-len(elements) // (workers * CHUNKS_PER_WORKER)))
+    context = DocumentContext.from_document(doc, images, warnings.strict)
+
+    if workers == 1:
+        _init_worker(context)
+        try:
+            first_block = True
+            for start in range(0, len(elements), chunk_size):
+                if deadline is not None:
+                    deadline.check()
+                chunk = [etree.tostring(element) for element in elements[start:start + chunk_size]]
+                first_block = _write_chunk(_convert_chunk(chunk, start, deadline), md_file, warnings, first_block)
+        finally:
+            _init_worker(None)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,))
+    try:
+        # 按顺序写出结果，同时最多保持两倍进程数的块在处理中
+        running = collections.deque()
+        first_block = True
+        for start in range(0, len(elements), chunk_size):
+            if deadline is not None:
+                deadline.check()
+            chunk = [etree.tostring(element) for element in elements[start:start + chunk_size]]
+            # time.monotonic() 是系统级时钟，截止时间在工作进程中同样有效
+            running.append(executor.submit(_convert_chunk, chunk, start, deadline))
+            if len(running) >= 2 * workers:
+                first_block = _write_chunk(running.popleft().result(), md_file, warnings, first_block)
+        while running:
+            if deadline is not None:
+                deadline.check()
+            first_block = _write_chunk(running.popleft().result(), md_file, warnings, first_block)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _write_chunk(result, md_file, warnings, first_block):
+    markdown, chunk_warnings = result
+    warnings.merge(chunk_warnings)
+    for text in markdown:
+        if not first_block:
+            md_file.write("\n\n")
+        md_file.write(text)
+        first_block = False
+    return first_block
+
+
+class DocumentContext:
+    """
+    The parts of a document a detached chunk of body XML needs.
+
+    Acts as the `part` of the paragraphs and tables rebuilt in a worker
+    process, or streamed from the package in split mode: it answers the
+    style and relationship lookups python-docx makes, from plain dicts that
+    can be pickled.
+    """
+
+    def __init__(self, style_names, default_style_name, hyperlinks, images, strict=False):
+        self.style_names = style_names
+        self.default_style_name = default_style_name
+        self.rels = {rId: _Relationship(target) for rId, target in hyperlinks.items()}
+        self.images = images
+        self.strict = strict
+
+    @classmethod
+    def from_document(cls, doc, images, strict=False):
+        style_names = {
+            style.style_id: style.name for style in doc.styles if style.type == WD_STYLE_TYPE.PARAGRAPH
+        }
+        default_style = doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)
+        hyperlinks = {rel.rId: rel.target_ref for rel in doc.part.rels.values() if "hyperlink" in rel.reltype}
+        return cls(style_names, default_style.name if default_style else None, hyperlinks, images, strict)
+
+    @classmethod
+    def from_package(cls, package, relationships, images=None, strict=False):
+        """
+        Build the context from an open .docx zip without loading the document.
+
+        :param package: `zipfile.ZipFile` of the .docx file.
+        :param relationships: Relationships of the main document part, as
+            returned by `read_relationships`.
+        """
+        style_names = {}
+        default_style_name = "Normal"  # python-docx 对没有样式部件的文档同样使用 Normal
+        styles_part = next((target for reltype, target in relationships.values() if reltype.endswith("/styles")), None)
+        if styles_part is not None:
+            styles = Styles(parse_xml(package.read(styles_part)))
+            style_names = {
+                style.style_id: style.name for style in styles if style.type == WD_STYLE_TYPE.PARAGRAPH
+            }
+            default_style = styles.default(WD_STYLE_TYPE.PARAGRAPH)
+            default_style_name = default_style.name if default_style else None
+        hyperlinks = {rId: target for rId, (reltype, target) in relationships.items() if "hyperlink" in reltype}
+        return cls(style_names, default_style_name, hyperlinks, images, strict)
+
+    @property
+    def part(self):
+        return self
+
+    def get_style(self, style_id, style_type):
+        # 与 python-docx 相同：未知的样式使用默认段落样式
+        return _Style(self.style_names.get(style_id, self.default_style_name))
+
+
+def read_relationships(package, partname="word/document.xml"):
+    """
+    Read the relationships of a part straight from the zip package.
+
+    The relationship part is streamed, so documents with many hyperlinks do
+    not build a tree of them.
+
+    :return: Dict mapping rId to (relationship type, target), where the
+        target of an internal relationship is the name of the zip member it
+        points to (e.g. "word/media/image1.png").
+    """
+    folder, name = posixpath.split(partname)
+    rels_name = posixpath.join(folder, "_rels", name + ".rels")
+    relationships = {}
+    if rels_name not in package.namelist():
+        return relationships
+    with package.open(rels_name) as rels_xml:
+        for _, rel in etree.iterparse(rels_xml, tag=f"{{{RELATIONSHIPS_NS}}}Relationship"):
+            target = rel.get("Target")
+            if rel.get("TargetMode") != "External":
+                target = posixpath.normpath(posixpath.join(folder, target)).lstrip("/")
+            relationships[rel.get("Id")] = (rel.get("Type"), target)
+            rel.clear()
+    return relationships
+
+
+_Style = collections.namedtuple("_Style", ["name"])
+_Relationship = collections.namedtuple("_Relationship", ["target_ref"])
+
+_context = None
+
+
+def _init_worker(context):
+    global _context
+    _context = context
+
+
+def _convert_chunk(chunk, start, deadline=None):
+    """Convert serialized body elements; return their Markdown and warnings."""
+    warnings = ConversionWarnings(strict=_context.strict)
+    markdown = []
+    for offset, xml in enumerate(chunk):
+        element = parse_xml(xml)
+        if element.tag == qn("w:p"):
+            block = Paragraph(element, _context)
+        else:
+            block = Table(element, _context)
+        markdown.append(convert_block(block, start + offset, _context.images, warnings, deadline)["markdown"])
+    return markdown, warnings
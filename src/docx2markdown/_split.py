@@ -0,0 +1,166 @@
+import collections
+import re
+import zipfile
+from pathlib import Path
+from urllib.parse import quote
+
+from docx.oxml.parser import element_class_lookup
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from ._docx_to_markdown import W_P, W_NS, convert_block, get_heading_level, relative_image_info, save_image
+from ._parallel import DocumentContext, read_relationships
+
+W_BODY = f"{{{W_NS}}}body"
+W_TBL = f"{{{W_NS}}}tbl"
+
+
+def write_sections(docx_file, output_md, split_level, warnings=None, deadline=None):
+    """
+    Write a document as one Markdown file per section plus an index file.
+
+    A new section starts at every heading of level `split_level` or higher
+    (e.g. `split_level=2` splits at "Heading 1" and "Heading 2"). For
+    `output_md="out/manual.md"` the sections are written to
+    `out/manual/001-<heading>.md` with their images in
+    `out/manual/.imgs/001-<heading>/`, and `out/manual.md` becomes a table of
+    contents linking to them. Each section file is closed as soon as the
+    next section starts and images are only saved when a section uses them.
+
+    The document is never loaded with python-docx: the paragraphs and
+    tables of `word/document.xml` are streamed from the zip package one at
+    a time (see `iter_body_blocks`), so memory is bounded by the largest
+    block and image rather than by the whole document.
+
+    :param docx_file: Path of the .docx file (or a binary file object).
+    :param output_md: Path of the index file.
+    :param split_level: Heading level (1-3) to split at.
+    :param warnings: `ConversionWarnings` receiving the problems found.
+    :param deadline: Optional `Deadline` checked before and within every
+        block, see `iter_blocks`.
+    :return: List of the section file paths.
+    """
+    output_md = Path(output_md)
+    section_folder = output_md.parent / output_md.stem
+    section_folder.mkdir(parents=True, exist_ok=True)
+
+    sections = []
+    section_file = None
+    first_block = True
+
+    with zipfile.ZipFile(docx_file) as package, open(output_md, "w", encoding="utf-8") as index_file:
+        relationships = read_relationships(package)
+        context = DocumentContext.from_package(package, relationships)
+        images = SectionImages(package, relationships)
+        index_file.write(f"# {output_md.stem}\n\n")
+        try:
+            for index, block in enumerate(iter_body_blocks(package, context)):
+                if deadline is not None:
+                    deadline.check()
+                level = None
+                if isinstance(block, Paragraph):
+                    level = get_heading_level(block.style.name)
+
+                # 遇到分割级别的标题，或文档开头没有标题时，开始新的章节
+                if section_file is None or (level is not None and level <= split_level):
+                    if section_file is not None:
+                        section_file.close()
+                    title = block.text.strip() if level is not None else output_md.stem
+                    section_name = f"{len(sections) + 1:03d}-{slugify(title)}"
+                    section_path = section_folder / f"{section_name}.md"
+                    images.start_section(str(section_folder / ".imgs" / section_name), str(section_folder))
+                    section_file = open(section_path, "w", encoding="utf-8")
+                    first_block = True
+
+                    link = quote(f"{output_md.stem}/{section_path.name}")
+                    indent = "  " * ((level or 1) - 1)
+                    index_file.write(f"{indent}- [{escape_link_text(title or section_name)}]({link})\n")
+                    sections.append(section_path)
+
+                if not first_block:
+                    section_file.write("\n\n")
+                section_file.write(convert_block(block, index, images, warnings, deadline)["markdown"])
+                first_block = False
+        finally:
+            if section_file is not None:
+                section_file.close()
+
+    return sections
+
+
+def iter_body_blocks(package, part):
+    """
+    Stream the paragraphs and tables of the document body from the package.
+
+    `word/document.xml` is parsed with `iterparse` using python-docx's
+    element classes, and each direct child of `w:body` is yielded as a
+    `Paragraph` or `Table` whose part is `part` (a `DocumentContext`). Once
+    the consumer moves on, the block is cleared and removed from the tree,
+    so only one block is held in memory at a time.
+    """
+    with package.open("word/document.xml") as document_xml:
+        events = etree.iterparse(document_xml, events=("end",))
+        events.set_element_class_lookup(element_class_lookup)
+        for _, element in events:
+            parent = element.getparent()
+            if parent is None or parent.tag != W_BODY or element.tag not in (W_P, W_TBL):
+                continue
+            yield Paragraph(element, part) if element.tag == W_P else Table(element, part)
+            # 释放已转换的块，w:body 下不再累积节点
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def slugify(title, max_length=50):
+    """Turn a heading into a file name part, keeping letters of any script."""
+    slug = re.sub(r"[^\w]+", "-", title.lower()).strip("-_")
+    return slug[:max_length].rstrip("-_") or "section"
+
+
+def escape_link_text(text):
+    """Escape the characters that would end the text of a Markdown link."""
+    return re.sub(r"([\\\[\]])", r"\\\1", text)
+
+
+ImagePart = collections.namedtuple("ImagePart", ["partname", "blob"])
+
+
+class SectionImages:
+    """
+    Image lookup by relationship id that saves images on first use.
+
+    Behaves like the dict returned by `save_images`, but an image is only
+    written when a section references it, into that section's image folder,
+    and is read from the zip package only then. An image used by several
+    sections is saved once per section so every section folder is
+    self-contained.
+    """
+
+    def __init__(self, package, relationships):
+        self.package = package
+        # 外部链接的图片不在包内，与 save_images 一样不予保存
+        self.parts = {
+            rId: target for rId, (reltype, target) in relationships.items()
+            if "image" in reltype and target in package.NameToInfo
+        }
+        self.image_folder = None
+        self.folder = None
+        self.saved = {}
+
+    def start_section(self, image_folder, folder):
+        """Save subsequently used images into `image_folder`, relative to `folder`."""
+        self.image_folder = image_folder
+        self.folder = folder
+        self.saved = {}
+
+    def __contains__(self, rId):
+        return rId in self.parts
+
+    def __getitem__(self, rId):
+        if rId not in self.saved:
+            partname = self.parts[rId]
+            image_info = save_image(ImagePart("/" + partname, self.package.read(partname)), self.image_folder)
+            self.saved[rId] = relative_image_info(image_info, self.folder)
+        return self.saved[rId]
@@ -1,14 +1,159 @@
 def command_line_interface():
     import sys
-    from ._docx_to_markdown import docx_to_markdown
+    import argparse
+
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        watch_command_line_interface(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "archive":
+        archive_command_line_interface(sys.argv[2:])
+        return
+
+    from ._docx_to_markdown import docx_to_markdown, MODES
     from ._markdown_to_docx import markdown_to_docx
+    from ._warnings import ConversionError
+
+    parser = argparse.ArgumentParser(
+        prog="docx2markdown",
+        description="Convert a .docx file to markdown or a .md file to .docx.",
+        epilog="Use 'docx2markdown watch <src> <dst>' to keep a folder in sync and "
+               "'docx2markdown archive <input> <output.zip>' to convert archives.",
+    )
+    parser.add_argument("filename1", help="input file (.docx or .md)")
+    parser.add_argument("filename2", help="output file (.md or .docx)")
+    parser.add_argument("--mode", choices=MODES, default="markdown",
+                        help="'text' only extracts plain text from a .docx file, e.g. for search indexing")
+    parser.add_argument("--split-level", type=int, choices=(1, 2, 3), default=None,
+                        help="write one .md file per section starting at headings of this level "
+                             "and make the output file a table of contents")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first unsupported style or element instead of reporting a summary")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="convert the body of one large .docx file in this many processes")
+    add_limit_arguments(parser)
+    options = parser.parse_args()
+
+    filename1 = options.filename1
+    filename2 = options.filename2
+
+    # 不支持的选项组合直接报错，而不是忽略或抛出异常
+    if (options.split_level is not None or options.workers is not None) and not filename1.lower().endswith(".docx"):
+        parser.error("--split-level and --workers only apply to .docx input files")
+    if options.split_level is not None and options.mode != "markdown":
+        parser.error("--split-level is only supported with --mode markdown")
+    if options.workers is not None and options.workers < 1:
+        parser.error("--workers must be at least 1")
+    if options.workers is not None and options.workers > 1:
+        if options.mode != "markdown":
+            parser.error("--workers is only supported with --mode markdown")
+        if options.split_level is not None:
+            parser.error("--workers cannot be combined with --split-level")
 
-    filename1 = sys.argv[1]
-    filename2 = sys.argv[2]
+    warnings = None
+    try:
+        if filename1.lower().endswith(".docx") and options.mode != "markdown":
+            warnings = docx_to_markdown(filename1, filename2, mode=options.mode, strict=options.strict,
+                                        limits=limits_from_options(options))
+        elif filename1.lower().endswith(".docx") and filename2.lower().endswith(".md"):
+            warnings = docx_to_markdown(filename1, filename2, split_level=options.split_level,
+                                        strict=options.strict, workers=options.workers,
+                                        limits=limits_from_options(options))
+    except ConversionError as e:
+        print(f"Conversion failed: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    if filename1.lower().endswith(".docx") and filename2.lower().endswith(".md"):
-        docx_to_markdown(filename1, filename2)
+    if warnings is not None:
+        if warnings:
+            print(warnings.summary(), file=sys.stderr)
     elif filename1.lower().endswith(".md") and filename2.lower().endswith(".docx"):
         markdown_to_docx(filename1, filename2)
     else:
         print("Conversion not supported. Please provide a .md and a .docx file, or a .docx and a .md file.")
+
+
+def watch_command_line_interface(args):
+    import argparse
+    from ._watch import watch
+
+    parser = argparse.ArgumentParser(
+        prog="docx2markdown watch",
+        description="Watch a folder and convert created or changed .docx/.md files into another folder.",
+    )
+    parser.add_argument("src", help="folder to watch")
+    parser.add_argument("dst", help="folder receiving the converted files")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="seconds a file must stay unchanged before it is converted (default: 1.0)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="polling interval in seconds (default: 1.0)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of conversion processes (default: CPU count)")
+    parser.add_argument("--polling", action="store_true",
+                        help="always poll, even when watchdog is installed")
+    add_limit_arguments(parser)
+    options = parser.parse_args(args)
+
+    watch(options.src, options.dst, debounce=options.debounce, interval=options.interval,
+          max_workers=options.workers, use_watchdog=not options.polling, limits=limits_from_options(options))
+
+
+def archive_command_line_interface(args):
+    import sys
+    import argparse
+    from ._archive import convert_archive
+    from ._docx_to_markdown import MODES
+
+    parser = argparse.ArgumentParser(
+        prog="docx2markdown archive",
+        description="Convert all .docx files inside a zip or tar archive into a zip archive.",
+    )
+    parser.add_argument("input", help="zip or tar archive containing .docx files")
+    parser.add_argument("output", help="zip file receiving the converted files and images")
+    parser.add_argument("--mode", choices=MODES, default="markdown", help="output format (default: markdown)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of conversion processes (default: CPU count)")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail a document at its first unsupported style or element")
+    add_limit_arguments(parser)
+    options = parser.parse_args(args)
+
+    result = convert_archive(options.input, options.output, mode=options.mode, max_workers=options.workers,
+                             strict=options.strict, limits=limits_from_options(options))
+    for name, error in result["failed"]:
+        print(f"Failed to convert {name}: {error}", file=sys.stderr)
+    print(f"Converted {len(result['converted'])} files, {len(result['failed'])} failed.")
+    if result["warnings"]:
+        print(result["warnings"].summary(), file=sys.stderr)
+
+
+def add_limit_arguments(parser):
+    """Add the per-document resource limit options to an argument parser."""
+    from ._limits import ResourceLimits, MB
+
+    defaults = ResourceLimits()
+    group = parser.add_argument_group("resource limits per document")
+    group.add_argument("--max-total-size", type=float, default=defaults.max_total_size / MB, metavar="MB",
+                       help="total uncompressed size of the .docx package (default: %(default)s)")
+    group.add_argument("--max-part-size", type=float, default=defaults.max_part_size / MB, metavar="MB",
+                       help="uncompressed size of any part, e.g. one image (default: %(default)s)")
+    group.add_argument("--max-elements", type=int, default=defaults.max_elements,
+                       help="XML elements in word/document.xml (default: %(default)s)")
+    group.add_argument("--max-images", type=int, default=defaults.max_images,
+                       help="images in the package (default: %(default)s)")
+    group.add_argument("--time-budget", type=float, default=defaults.time_budget, metavar="SECONDS",
+                       help="wall-clock time per document (default: unlimited)")
+    group.add_argument("--no-limits", action="store_true", help="do not enforce any of these limits")
+
+
+def limits_from_options(options):
+    """Return the `ResourceLimits` selected on the command line, or None."""
+    from ._limits import ResourceLimits, MB
+
+    if options.no_limits:
+        return None
+    return ResourceLimits(
+        max_total_size=int(options.max_total_size * MB),
+        max_part_size=int(options.max_part_size * MB),
+        max_elements=options.max_elements,
+        max_images=options.max_images,
+        time_budget=options.time_budget,
+    )
@@ -0,0 +1,58 @@
+from collections import Counter
+
+# 警告代码 -> 说明
+MESSAGES = {
+    "unsupported_style": "Unsupported style",
+    "unknown_run_type": "Unknown run type",
+}
+
+
+class ConversionError(Exception):
+    """Raised in strict mode for the first problem found in a document."""
+
+
+class ConversionWarnings:
+    """
+    Deduplicated, counted diagnostics of a conversion.
+
+    Each distinct (code, detail) pair is stored once with the number of
+    times it occurred, so a style used by ten thousand paragraphs costs a
+    dict update per paragraph instead of a console write. In strict mode
+    the first warning raises `ConversionError` instead.
+    """
+
+    def __init__(self, strict=False):
+        self.strict = strict
+        self.counts = Counter()
+
+    def warn(self, code, detail):
+        """Record one occurrence of warning `code` about `detail`."""
+        if self.strict:
+            raise ConversionError(f"{MESSAGES.get(code, code)}: {detail}")
+        self.counts[(code, detail)] += 1
+
+    def merge(self, other):
+        """Add the counts of another `ConversionWarnings`."""
+        self.counts.update(other.counts)
+
+    def __iter__(self):
+        """Yield (code, detail, count), most frequent first."""
+        for (code, detail), count in self.counts.most_common():
+            yield code, detail, count
+
+    def __len__(self):
+        return len(self.counts)
+
+    def total(self):
+        """Number of warnings including repetitions."""
+        return sum(self.counts.values())
+
+    def summary(self):
+        """Return a human readable multi-line summary."""
+        lines = [f"{self.total()} warnings ({len(self)} distinct):"]
+        for code, detail, count in self:
+            lines.append(f"  {MESSAGES.get(code, code)}: {detail} ({count}x)")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"ConversionWarnings({dict(self.counts)!r})"
@@ -0,0 +1,269 @@
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import BrokenExecutor
+from pathlib import Path
+
+from ._batch import WorkerPool, convert_file
+
+# 源文件扩展名 -> (输出扩展名, 转换类型)
+CONVERSIONS = {
+    ".docx": (".md", "docx2md"),
+    ".md": (".docx", "md2docx"),
+}
+
+
+def is_ignored(path):
+    """Return True for Word lock files, editor temp files and image folders."""
+    name = os.path.basename(path)
+    if name.startswith("~$") or name.startswith(".~") or name.endswith((".tmp", ".swp", "~")):
+        return True
+    if ".imgs" in Path(path).parts:
+        return True
+    return os.path.splitext(name)[1].lower() not in CONVERSIONS
+
+
+class Watcher:
+    """
+    Keep `dst` in sync with the .docx and .md files below `src`.
+
+    Created and changed files are converted, deleted files have their
+    outputs removed. Events for one path are debounced: it is only
+    converted once no new event arrived for `debounce` seconds, so a
+    burst of saves results in a single conversion. Changes are detected
+    with watchdog when it is installed and by polling file stats otherwise.
+    When a worker process dies, the pool is replaced and the files that
+    were converting are queued once more, each in its own process; a file
+    that crashes again there is reported as failed.
+    """
+
+    def __init__(self, src, dst, debounce=1.0, interval=1.0, max_workers=None, use_watchdog=True, limits=None):
+        self.src = Path(src).resolve()
+        self.dst = Path(dst).resolve()
+        if self.src == self.dst:
+            # 输出会再次触发反向转换
+            raise ValueError("The output folder must differ from the watched folder.")
+        self.debounce = debounce
+        self.interval = interval
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_watchdog = use_watchdog
+        self.limits = limits
+        self._pending = {}  # path -> time of the last event
+        self._running = {}  # path -> future
+        self._converted = {}  # path -> (mtime_ns, size) of the last converted version
+        self._crashed = set()  # paths already re-queued once after the pool broke
+        self._pool = None
+        self._lock = threading.Lock()
+        self._snapshot = {}
+
+    def output_path(self, path):
+        """Return the converted file path for a source path below `src`."""
+        path = Path(path)
+        output_ext, _ = CONVERSIONS[path.suffix.lower()]
+        return self.dst / path.relative_to(self.src).with_suffix(output_ext)
+
+    def mark(self, path):
+        """Record a change of `path`; it is processed after the debounce delay."""
+        path = os.path.abspath(path)
+        if is_ignored(path) or self._is_output(path):
+            return
+        with self._lock:
+            self._pending[path] = time.monotonic()
+
+    def run(self, stop_event=None):
+        """Watch until `stop_event` is set (or forever when it is None)."""
+        stop_event = stop_event or threading.Event()
+        observer = self._start_observer() if self.use_watchdog else None
+        if observer is None:
+            print(f"Watching {self.src} (polling every {self.interval}s)")
+        else:
+            print(f"Watching {self.src}")
+
+        self._snapshot = self._scan()
+        self._mark_outdated()
+
+        self._pool = WorkerPool(self.max_workers)
+        try:
+            while not stop_event.is_set():
+                if observer is None:
+                    self._poll()
+                self._dispatch()
+                stop_event.wait(min(self.interval, self.debounce))
+        finally:
+            self._pool.shutdown()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            # 没有安装 watchdog 时退回轮询模式
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            # 只处理写入类事件；watchdog 4 起读取文件也会产生 opened/closed_no_write 事件，
+            # 若一并处理，转换时读取源文件就会再次触发转换
+            def on_created(self, event):
+                self._mark(event)
+
+            def on_modified(self, event):
+                self._mark(event)
+
+            def on_deleted(self, event):
+                self._mark(event)
+
+            def on_moved(self, event):
+                self._mark(event)
+                if not event.is_directory:
+                    watcher.mark(event.dest_path)
+
+            def on_closed(self, event):
+                # 仅在写入后关闭时触发
+                self._mark(event)
+
+            @staticmethod
+            def _mark(event):
+                if not event.is_directory:
+                    watcher.mark(event.src_path)
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self.src), recursive=True)
+        observer.start()
+        return observer
+
+    def _is_output(self, path):
+        # 输出目录位于源目录内时，忽略转换结果本身
+        return Path(path).is_relative_to(self.dst)
+
+    def _scan(self):
+        """Return {path: (mtime_ns, size)} for all watched files."""
+        snapshot = {}
+        for root, dirs, files in os.walk(self.src):
+            dirs[:] = [d for d in dirs if d != ".imgs" and not self._is_output(os.path.join(root, d))]
+            for name in files:
+                path = os.path.join(root, name)
+                if is_ignored(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _poll(self):
+        snapshot = self._scan()
+        for path, stat in snapshot.items():
+            if self._snapshot.get(path) != stat:
+                self.mark(path)
+        for path in self._snapshot.keys() - snapshot.keys():
+            self.mark(path)
+        self._snapshot = snapshot
+
+    def _mark_outdated(self):
+        """Queue files whose output is missing or older than the source."""
+        for path, (mtime_ns, _) in self._snapshot.items():
+            output = self.output_path(path)
+            if not output.exists() or output.stat().st_mtime_ns < mtime_ns:
+                self.mark(path)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        with self._lock:
+            for path, future in list(self._running.items()):
+                if future.done():
+                    del self._running[path]
+                    if self._retry_after_crash(path, future):
+                        self._pending[path] = now
+                    else:
+                        self._report(path, future)
+
+            ready = [
+                path for path, last_event in self._pending.items()
+                if now - last_event >= self.debounce and path not in self._running
+            ]
+            for path in ready:
+                del self._pending[path]
+
+        for path in ready:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            if stat is not None:
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if self._converted.get(path) == signature:
+                    # 只有属性变化（如读取时更新访问时间），内容未变，无需重新转换
+                    continue
+                self._converted[path] = signature
+                output = self.output_path(path)
+                output.parent.mkdir(parents=True, exist_ok=True)
+                self._remove_images(output)
+                _, conversion_type = CONVERSIONS[Path(path).suffix.lower()]
+                with self._lock:
+                    # 重试时使用单独的进程，再次崩溃时可以确定是这个文件
+                    self._running[path] = self._pool.submit(
+                        convert_file, path, str(output.parent), conversion_type, self.limits,
+                        isolated=path in self._crashed)
+            else:
+                self._converted.pop(path, None)
+                self._remove_outputs(path)
+
+    def _retry_after_crash(self, path, future):
+        """Return True if `path` must be converted again because the pool broke."""
+        if not isinstance(future.exception(), BrokenExecutor) or path in self._crashed:
+            # 单独重试时再次崩溃，不再重试
+            self._crashed.discard(path)
+            return False
+        # 崩溃的也可能是同时运行的另一个文件，重新排队一次
+        self._crashed.add(path)
+        self._converted.pop(path, None)
+        return True
+
+    def _report(self, path, future):
+        try:
+            elapsed = future.result()
+            print(f"Converted {path} -> {self.output_path(path)} ({elapsed:.2f}s)")
+        except Exception as e:
+            print(f"Failed to convert {path}: {e}")
+
+    def _remove_outputs(self, path):
+        output = self.output_path(path)
+        if output.exists():
+            output.unlink()
+            print(f"Removed {output}")
+        self._remove_images(output)
+
+    @staticmethod
+    def _remove_images(output):
+        # docx_to_markdown 每次生成新的图片文件名，重新转换前先清理旧图片
+        if output.suffix == ".md":
+            shutil.rmtree(output.parent / ".imgs" / output.stem, ignore_errors=True)
+
+
+def watch(src, dst, debounce=1.0, interval=1.0, max_workers=None, use_watchdog=True, limits=None):
+    """
+    Watch `src` and re-convert created or changed files into `dst`.
+
+    Blocks until interrupted with Ctrl+C.
+
+    :param src: Folder containing .docx and .md files.
+    :param dst: Folder receiving the converted files (same relative layout).
+    :param debounce: Seconds a file must stay unchanged before converting.
+    :param interval: Polling interval in seconds when watchdog is missing.
+    :param max_workers: Size of the conversion process pool.
+    :param use_watchdog: Set to False to force polling.
+    :param limits: `ResourceLimits` applied to each converted .docx file.
+    :return: None
+    """
+    watcher = Watcher(src, dst, debounce, interval, max_workers, use_watchdog, limits)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
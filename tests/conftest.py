@@ -0,0 +1,31 @@
+import io
+import struct
+import zlib
+
+import docx
+
+
+def make_png(path):
+    """Write a 1x1 white PNG and return its path."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    pixels = zlib.compress(b"\x00\xff\xff\xff")
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", pixels) + chunk(b"IEND", b""))
+    return str(path)
+
+
+def make_docx(path, text="Hello"):
+    """Write a .docx with a single paragraph and return its path."""
+    document = docx.Document()
+    document.add_paragraph(text)
+    document.save(path)
+    return str(path)
+
+
+def docx_bytes(text="Hello"):
+    """Return the content of a .docx with a single paragraph."""
+    data = io.BytesIO()
+    make_docx(data, text)
+    return data.getvalue()
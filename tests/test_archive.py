@@ -0,0 +1,68 @@
+import os
+import zipfile
+
+from conftest import docx_bytes
+from docx2markdown import _archive, convert_archive
+from docx2markdown._archive import convert_member
+
+
+def crash_on_bad_members(name, *args):
+    if name.startswith("bad"):
+        # 模拟工作进程被系统杀死
+        os._exit(1)
+    return convert_member(name, *args)
+
+
+def test_converts_members_and_rejects_unsafe_names(tmp_path, capsys):
+    input_zip = tmp_path / "input.zip"
+    with zipfile.ZipFile(input_zip, "w") as archive:
+        archive.writestr("docs/./a.docx", docx_bytes("A"))
+        archive.writestr("../evil.docx", docx_bytes("B"))
+        archive.writestr("/abs.docx", docx_bytes("C"))
+        archive.writestr("broken.docx", b"not a docx file")
+
+    result = convert_archive(str(input_zip), str(tmp_path / "output.zip"), max_workers=1, limits=None)
+
+    assert result["converted"] == ["docs/./a.docx"]
+    assert sorted(name for name, _ in result["failed"]) == ["../evil.docx", "/abs.docx", "broken.docx"]
+    assert capsys.readouterr().out == ""
+    with zipfile.ZipFile(tmp_path / "output.zip") as output:
+        assert output.namelist() == ["docs/a.md"]
+        assert output.read("docs/a.md").decode("utf-8") == "A"
+
+
+def test_duplicate_output_names_fail(tmp_path):
+    input_zip = tmp_path / "input.zip"
+    with zipfile.ZipFile(input_zip, "w") as archive:
+        archive.writestr("docs/a.docx", docx_bytes("A"))
+        archive.writestr("docs/./a.docx", docx_bytes("B"))
+        archive.writestr("x.docx", docx_bytes("X"))
+        archive.writestr("x.DOCX", docx_bytes("Y"))
+
+    result = convert_archive(str(input_zip), str(tmp_path / "output.zip"), max_workers=1)
+
+    assert sorted(result["converted"]) == ["docs/a.docx", "x.docx"]
+    assert result["failed"] == [
+        ("docs/./a.docx", "Duplicate output name docs/a.md"),
+        ("x.DOCX", "Duplicate output name x.md"),
+    ]
+    with zipfile.ZipFile(tmp_path / "output.zip") as output:
+        assert sorted(output.namelist()) == ["docs/a.md", "x.md"]
+        assert output.read("docs/a.md").decode("utf-8") == "A"
+        assert output.read("x.md").decode("utf-8") == "X"
+
+
+def test_dead_worker_fails_only_its_member(tmp_path, monkeypatch):
+    monkeypatch.setattr(_archive, "convert_member", crash_on_bad_members)
+    input_zip = tmp_path / "input.zip"
+    with zipfile.ZipFile(input_zip, "w") as archive:
+        archive.writestr("a.docx", docx_bytes("A"))
+        archive.writestr("bad.docx", docx_bytes("B"))
+        archive.writestr("c.docx", docx_bytes("C"))
+
+    result = convert_archive(str(input_zip), str(tmp_path / "output.zip"), max_workers=1)
+
+    assert sorted(result["converted"]) == ["a.docx", "c.docx"]
+    assert [name for name, _ in result["failed"]] == ["bad.docx"]
+    with zipfile.ZipFile(tmp_path / "output.zip") as output:
+        assert sorted(output.namelist()) == ["a.md", "c.md"]
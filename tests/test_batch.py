@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import BrokenExecutor
+
+from conftest import make_docx
+from docx2markdown import BatchRunner, _batch
+
+
+def collect_events(runner):
+    events = []
+    while not runner.events.empty():
+        events.append(runner.events.get())
+    return events
+
+
+def test_events_in_order(tmp_path):
+    files = [make_docx(tmp_path / f"doc{i}.docx") for i in range(3)]
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+
+    runner = BatchRunner(files, str(output_folder), max_workers=2, use_processes=False)
+    runner.run()
+    events = collect_events(runner)
+
+    assert [event.kind for event in events] == ["done", "done", "done", "finished"]
+    assert [event.completed for event in events] == [1, 2, 3, 3]
+    assert sorted(event.path for event in events[:-1]) == files
+    assert all(event.total == 3 for event in events)
+    assert events[-1].eta == 0.0
+    for i in range(3):
+        assert (output_folder / f"doc{i}.md").exists()
+
+
+def test_failed_file_is_reported(tmp_path):
+    good = make_docx(tmp_path / "good.docx")
+    bad = tmp_path / "bad.docx"
+    bad.write_bytes(b"not a docx file")
+
+    runner = BatchRunner([good, str(bad)], str(tmp_path), max_workers=1, use_processes=False)
+    runner.run()
+    events = collect_events(runner)
+
+    assert [event.kind for event in events] == ["done", "failed", "finished"]
+    assert events[1].path == str(bad)
+    assert events[1].error is not None
+    assert events[-1].completed == 2
+
+
+def test_cancel_skips_pending_files(tmp_path, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_convert(input_file, *args):
+        started.set()
+        release.wait(5)
+        return 0.0
+
+    monkeypatch.setattr(_batch, "convert_file", slow_convert)
+    runner = BatchRunner([f"doc{i}.docx" for i in range(5)], str(tmp_path), max_workers=1, use_processes=False)
+    runner.start()
+    assert started.wait(5)
+    runner.cancel()
+    release.set()
+    runner.join(5)
+    events = collect_events(runner)
+
+    assert [event.kind for event in events] == ["done", "cancelled"]
+    assert events[-1].completed == 1
+    assert events[-1].total == 5
+
+
+def crash_on_bad_files(input_file, *args):
+    if "bad" in input_file:
+        # 模拟工作进程被系统杀死
+        os._exit(1)
+    return 0.0
+
+
+def test_dead_worker_fails_only_its_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(_batch, "convert_file", crash_on_bad_files)
+    files = ["doc0.docx", "bad.docx", "doc2.docx", "doc3.docx", "doc4.docx"]
+    runner = BatchRunner(files, str(tmp_path), max_workers=2)
+    runner.run()
+    events = collect_events(runner)
+
+    assert events[-1].kind == "finished"
+    assert events[-1].completed == 5
+    assert [event.completed for event in events[:-1]] == [1, 2, 3, 4, 5]
+    failed = [event for event in events if event.kind == "failed"]
+    assert [event.path for event in failed] == ["bad.docx"]
+    assert isinstance(failed[0].error, BrokenExecutor)
+    assert sorted(event.path for event in events if event.kind == "done") == [
+        "doc0.docx", "doc2.docx", "doc3.docx", "doc4.docx"
+    ]
@@ -0,0 +1,76 @@
+import zipfile
+
+import docx
+import pytest
+
+from conftest import make_png
+from docx2markdown import markdown_to_docx, markdown_to_docx_streaming
+from docx2markdown._docx_writer import StreamingDocxWriter
+
+
+def describe(docx_file):
+    """Return the parts of a document both converters must agree on."""
+    document = docx.Document(docx_file)
+    paragraphs = []
+    for paragraph in document.paragraphs:
+        # markdown_to_docx 把 w:numPr 直接放在 w:p 下，只比较列表级别
+        ilvl = paragraph._element.xpath(".//w:numPr/w:ilvl/@w:val")
+        paragraphs.append((
+            paragraph.style.name,
+            paragraph.text,
+            ilvl,
+            [(run.bold, run.italic) for run in paragraph.runs],
+            [(link.text, link.address) for link in paragraph.hyperlinks],
+        ))
+    tables = [
+        (table.style.name, [[cell.text for cell in row.cells] for row in table.rows])
+        for table in document.tables
+    ]
+    images = [(shape.width, shape.height) for shape in document.inline_shapes]
+    return paragraphs, tables, images
+
+
+def test_streaming_writer_matches_markdown_to_docx(tmp_path):
+    make_png(tmp_path / "logo.png")
+    (tmp_path / "input.md").write_text(
+        "# Title\n"
+        "\n"
+        "## Section\n"
+        "- First\n"
+        "  - Nested\n"
+        "1. Numbered\n"
+        "Some **bold** and *italic* text\n"
+        "See [docs](https://example.com/docs) and [docs again](https://example.com/docs)\n"
+        "![logo](./logo.png)\n"
+        "| Name | Value |\n"
+        "| --- | --- |\n"
+        "| a | 1 |\n"
+        "\n"
+        "Plain text\n",
+        encoding="utf-8",
+    )
+
+    markdown_to_docx(str(tmp_path / "input.md"), str(tmp_path / "reference.docx"))
+    markdown_to_docx_streaming(str(tmp_path / "input.md"), str(tmp_path / "streamed.docx"))
+
+    paragraphs, tables, images = describe(tmp_path / "streamed.docx")
+    assert (paragraphs, tables, images) == describe(tmp_path / "reference.docx")
+    assert [paragraph[4] for paragraph in paragraphs if paragraph[4]] == [
+        [("docs", "https://example.com/docs"), ("docs again", "https://example.com/docs")]
+    ]
+    assert tables == [("Table Grid", [["Name", "Value"], ["a", "1"]])]
+    assert len(images) == 1
+
+
+def test_writer_is_closed_when_streaming_fails(tmp_path):
+    def blocks():
+        yield ("text", "Before")
+        raise ValueError("bad block")
+
+    with zipfile.ZipFile(tmp_path / "out.docx", "w") as package:
+        with pytest.raises(ValueError, match="bad block"):
+            with StreamingDocxWriter(package) as writer:
+                writer.write_document(blocks(), tmp_path)
+
+    assert writer.relationships.closed
+    assert writer.template.fp is None
@@ -0,0 +1,68 @@
+import zipfile
+
+import docx
+import pytest
+
+from conftest import make_docx
+from docx2markdown import ResourceLimitExceeded, ResourceLimits, _docx_to_markdown, convert_archive, docx_to_markdown
+from docx2markdown._limits import Deadline
+
+
+def make_many_runs_docx(path, runs):
+    """Write a .docx whose single paragraph holds `runs` empty runs."""
+    document = docx.Document()
+    paragraph = document.add_paragraph()
+    for _ in range(runs):
+        paragraph.add_run()
+    document.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("mode", ["markdown", "text", "ndjson"])
+def test_max_elements_in_every_mode(tmp_path, mode):
+    docx_file = make_many_runs_docx(tmp_path / "runs.docx", 2000)
+
+    with pytest.raises(ResourceLimitExceeded):
+        docx_to_markdown(docx_file, str(tmp_path / "out"), mode=mode, limits=ResourceLimits(max_elements=1000))
+
+
+def test_text_mode_time_budget(tmp_path):
+    docx_file = make_many_runs_docx(tmp_path / "runs.docx", 50000)
+
+    with pytest.raises(ResourceLimitExceeded, match="Time budget"):
+        docx_to_markdown(docx_file, str(tmp_path / "runs.txt"), mode="text",
+                         limits=ResourceLimits(max_elements=None, time_budget=0))
+
+
+@pytest.mark.parametrize("mode", ["markdown", "ndjson"])
+def test_time_budget_within_one_paragraph(tmp_path, monkeypatch, mode):
+    docx_file = make_many_runs_docx(tmp_path / "runs.docx", 1000)
+    monkeypatch.setattr(_docx_to_markdown, "CHECK_INTERVAL", 100)
+    checks = []
+
+    def check(deadline):
+        # 预算在唯一的段落开始转换之后才用完
+        checks.append(deadline)
+        if len(checks) > 1:
+            raise ResourceLimitExceeded("Time budget exceeded")
+
+    monkeypatch.setattr(Deadline, "check", check)
+    with pytest.raises(ResourceLimitExceeded, match="Time budget"):
+        docx_to_markdown(docx_file, str(tmp_path / "runs.md"), mode=mode,
+                         limits=ResourceLimits(max_elements=None, time_budget=60))
+    assert len(checks) == 2
+
+
+def test_oversized_archive_member_is_not_read(tmp_path):
+    make_docx(tmp_path / "small.docx", "Small")
+    input_zip = tmp_path / "input.zip"
+    with zipfile.ZipFile(input_zip, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.write(tmp_path / "small.docx", "small.docx")
+        archive.writestr("huge.docx", b"\0" * 2_000_000)
+
+    result = convert_archive(str(input_zip), str(tmp_path / "output.zip"), max_workers=1,
+                             limits=ResourceLimits(max_total_size=1_000_000))
+
+    assert result["converted"] == ["small.docx"]
+    assert [name for name, _ in result["failed"]] == ["huge.docx"]
+    assert "limit" in result["failed"][0][1]
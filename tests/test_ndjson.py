@@ -0,0 +1,26 @@
+import json
+
+import docx
+
+from conftest import make_png
+from docx2markdown import docx_to_markdown
+
+
+def test_table_block_has_text_and_images(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Name"
+    table.cell(0, 1).text = "Picture"
+    table.cell(1, 0).text = "Logo"
+    table.cell(1, 1).paragraphs[0].add_run().add_picture(make_png(tmp_path / "logo.png"))
+    document.save(tmp_path / "table.docx")
+
+    docx_to_markdown(str(tmp_path / "table.docx"), str(tmp_path / "table.ndjson"), mode="ndjson")
+    with open(tmp_path / "table.ndjson", encoding="utf-8") as ndjson_file:
+        blocks = [json.loads(line) for line in ndjson_file]
+
+    table_block = next(block for block in blocks if block["type"] == "table")
+    assert table_block["cells"] == [["Name", "Picture"], ["Logo", ""]]
+    assert table_block["text"] == "Name\tPicture\nLogo\t"
+    assert len(table_block["images"]) == 1
+    assert (tmp_path / table_block["images"][0]).exists()
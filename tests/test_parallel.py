@@ -0,0 +1,54 @@
+import re
+
+import docx
+from docx.shared import Inches
+
+from conftest import make_png
+from docx2markdown import _parallel, docx_to_markdown
+from docx2markdown._markdown_to_docx import add_hyperlink
+
+
+def make_mixed_docx(path, image):
+    document = docx.Document()
+    document.add_heading("Title", level=1)
+    document.add_paragraph("Intro with ").add_run("bold").bold = True
+    document.add_paragraph("First", style="List Bullet")
+    document.add_paragraph("Second", style="List Bullet 2")
+    document.add_heading("Links", level=2)
+    add_hyperlink(document.add_paragraph("See "), "https://example.com", "example")
+    document.add_paragraph().add_run().add_picture(image, width=Inches(1))
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Name"
+    table.cell(0, 1).text = "Value"
+    table.cell(1, 0).text = "a"
+    table.cell(1, 1).text = "1"
+    for i in range(3):
+        document.add_paragraph(f"Quoted {i}", style="Quote")
+    document.add_heading("End", level=3)
+    document.save(path)
+    return str(path)
+
+
+def convert(docx_file, output_md, workers):
+    warnings = docx_to_markdown(docx_file, str(output_md), workers=workers)
+    # 图片文件名每次随机生成
+    markdown = re.sub(r"[0-9a-f]{10}\.png", "IMAGE.png", output_md.read_text(encoding="utf-8"))
+    return markdown, list(warnings)
+
+
+def test_parallel_output_matches_serial(tmp_path, monkeypatch):
+    # 每个块只含一个段落或表格，确保用到多个块
+    monkeypatch.setattr(_parallel, "CHUNKS_PER_WORKER", 100)
+    docx_file = make_mixed_docx(tmp_path / "doc.docx", make_png(tmp_path / "image.png"))
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+
+    serial = convert(docx_file, tmp_path / "serial" / "doc.md", None)
+    parallel = convert(docx_file, tmp_path / "parallel" / "doc.md", 2)
+
+    assert parallel == serial
+    markdown, warnings = serial
+    assert "[example](https://example.com)" in markdown
+    assert "IMAGE.png" in markdown
+    assert "| Name | Value |" in markdown
+    assert warnings == [("unsupported_style", "Quote", 3)]
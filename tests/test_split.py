@@ -0,0 +1,64 @@
+import re
+
+import docx
+from docx.shared import Inches
+
+from conftest import make_png
+from docx2markdown import docx_to_markdown
+from docx2markdown._markdown_to_docx import add_hyperlink
+
+
+def test_sections_and_index(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Preface")
+    document.add_heading("Intro [draft]", level=1)
+    document.add_paragraph("First")
+    document.add_heading("Details", level=2)
+    document.add_paragraph("Second")
+    document.add_heading("End", level=1)
+    document.save(tmp_path / "manual.docx")
+
+    docx_to_markdown(str(tmp_path / "manual.docx"), str(tmp_path / "manual.md"), split_level=1)
+
+    sections = sorted(path.name for path in (tmp_path / "manual").glob("*.md"))
+    assert sections == ["001-manual.md", "002-intro-draft.md", "003-end.md"]
+    assert (tmp_path / "manual" / "002-intro-draft.md").read_text(encoding="utf-8") == (
+        "# Intro [draft]\n\nFirst\n\n## Details\n\nSecond"
+    )
+    index = (tmp_path / "manual.md").read_text(encoding="utf-8")
+    assert "- [Intro \\[draft\\]](manual/002-intro-draft.md)\n" in index
+
+
+def test_sections_are_streamed_without_loading_the_document(tmp_path, monkeypatch):
+    document = docx.Document()
+    document.add_paragraph("Preface with ").add_run("bold").bold = True
+    document.add_heading("Intro", level=1)
+    document.add_paragraph("First", style="List Bullet")
+    add_hyperlink(document.add_paragraph("See "), "https://example.com", "example")
+    document.add_heading("Data", level=1)
+    document.add_paragraph().add_run().add_picture(make_png(tmp_path / "image.png"), width=Inches(1))
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "a"
+    table.cell(0, 1).text = "1"
+    document.add_paragraph("Quoted", style="Quote")
+    document.save(tmp_path / "manual.docx")
+    (tmp_path / "whole").mkdir()
+    docx_to_markdown(str(tmp_path / "manual.docx"), str(tmp_path / "whole" / "manual.md"))
+
+    def load_document(*args):
+        raise AssertionError("split mode must not load the document")
+
+    monkeypatch.setattr(docx, "Document", load_document)
+    warnings = docx_to_markdown(str(tmp_path / "manual.docx"), str(tmp_path / "manual.md"), split_level=1)
+
+    sections = sorted((tmp_path / "manual").glob("*.md"))
+    assert [path.name for path in sections] == ["001-manual.md", "002-intro.md", "003-data.md"]
+    # 各章节依次拼接后与不分章节的输出相同（图片路径除外）
+    split_markdown = "\n\n".join(path.read_text(encoding="utf-8") for path in sections)
+    whole_markdown = (tmp_path / "whole" / "manual.md").read_text(encoding="utf-8")
+    image_path = re.compile(r"\./\.imgs/[^\"]+")
+    assert image_path.sub("IMAGE", split_markdown) == image_path.sub("IMAGE", whole_markdown)
+    assert "[example](https://example.com)" in split_markdown
+    image = image_path.search((tmp_path / "manual" / "003-data.md").read_text(encoding="utf-8")).group()
+    assert (tmp_path / "manual" / image).exists()
+    assert list(warnings) == [("unsupported_style", "Quote", 1)]
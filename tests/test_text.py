@@ -0,0 +1,33 @@
+import docx
+from docx.oxml import OxmlElement
+from docx.shared import Inches
+
+from conftest import make_png
+from docx2markdown import docx_to_markdown
+
+
+def test_text_mode_writes_one_line_per_paragraph(tmp_path):
+    document = docx.Document()
+    document.add_heading("Title", level=1)
+    paragraph = document.add_paragraph()
+    # w:pPr/w:tabs 中的制表位定义不应输出
+    paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(1))
+    run = paragraph.add_run("a")
+    run.add_tab()
+    run.add_text("b")
+    run = document.add_paragraph().add_run("line1")
+    run.add_break()
+    run.add_text("line2")
+    run._r.append(OxmlElement("w:cr"))
+    run.add_text("line3")
+    document.add_paragraph().add_run().add_picture(make_png(tmp_path / "image.png"))
+    document.add_paragraph("Last")
+    document.save(tmp_path / "doc.docx")
+    (tmp_path / "out").mkdir()
+
+    docx_to_markdown(str(tmp_path / "doc.docx"), str(tmp_path / "out" / "doc.txt"), mode="text")
+
+    assert (tmp_path / "out" / "doc.txt").read_text(encoding="utf-8") == (
+        "Title\na\tb\nline1\nline2\nline3\n\nLast\n"
+    )
+    assert [path.name for path in (tmp_path / "out").iterdir()] == ["doc.txt"]
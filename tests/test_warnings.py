@@ -0,0 +1,57 @@
+import sys
+
+import docx
+import pytest
+
+from docx2markdown import ConversionError, ConversionWarnings, docx_to_markdown
+from docx2markdown._terminal import command_line_interface
+
+
+def make_quote_docx(path):
+    document = docx.Document()
+    document.add_heading("Title", level=1)
+    for i in range(3):
+        document.add_paragraph(f"Quoted {i}", style="Quote")
+    document.add_paragraph("Closing", style="Intense Quote")
+    document.save(path)
+    return str(path)
+
+
+def test_warnings_are_counted_once_per_style(tmp_path):
+    docx_file = make_quote_docx(tmp_path / "quotes.docx")
+
+    warnings = docx_to_markdown(docx_file, str(tmp_path / "quotes.md"))
+
+    assert isinstance(warnings, ConversionWarnings)
+    assert warnings.total() == 4
+    assert len(warnings) == 2
+    assert list(warnings) == [("unsupported_style", "Quote", 3), ("unsupported_style", "Intense Quote", 1)]
+    assert "4 warnings (2 distinct)" in warnings.summary()
+    assert (tmp_path / "quotes.md").read_text(encoding="utf-8").startswith("# Title\n\nQuoted 0")
+
+
+def test_strict_raises_at_first_warning(tmp_path):
+    docx_file = make_quote_docx(tmp_path / "quotes.docx")
+
+    with pytest.raises(ConversionError, match="Unsupported style: Quote"):
+        docx_to_markdown(docx_file, str(tmp_path / "quotes.md"), strict=True)
+
+
+def test_command_line_prints_summary(tmp_path, monkeypatch, capsys):
+    docx_file = make_quote_docx(tmp_path / "quotes.docx")
+    monkeypatch.setattr(sys, "argv", ["docx2markdown", docx_file, str(tmp_path / "quotes.md")])
+
+    command_line_interface()
+
+    assert "4 warnings (2 distinct)" in capsys.readouterr().err
+
+
+def test_command_line_strict_exits_with_status_1(tmp_path, monkeypatch, capsys):
+    docx_file = make_quote_docx(tmp_path / "quotes.docx")
+    monkeypatch.setattr(sys, "argv", ["docx2markdown", docx_file, str(tmp_path / "quotes.md"), "--strict"])
+
+    with pytest.raises(SystemExit) as excinfo:
+        command_line_interface()
+
+    assert excinfo.value.code == 1
+    assert "Conversion failed: Unsupported style: Quote" in capsys.readouterr().err
@@ -0,0 +1,103 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from conftest import make_docx
+from docx2markdown import _watch
+from docx2markdown._batch import convert_file
+from docx2markdown._watch import Watcher
+
+
+def crash_on_bad_files(input_file, *args):
+    if "bad" in os.path.basename(input_file):
+        # 模拟工作进程被系统杀死
+        os._exit(1)
+    return convert_file(input_file, *args)
+
+
+class Output:
+    """Collect what the watcher printed so far."""
+
+    def __init__(self, capsys):
+        self.capsys = capsys
+        self.text = ""
+
+    def __str__(self):
+        self.text += self.capsys.readouterr().out
+        return self.text
+
+
+def wait_until(condition, timeout=10):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out waiting for the watcher"
+        time.sleep(0.05)
+
+
+def start_watcher(watcher):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop_event,))
+    thread.start()
+    # 进程池在观察者启动并扫描完源目录之后才创建
+    wait_until(lambda: watcher._pool is not None)
+    return stop_event, thread
+
+
+def is_idle(watcher):
+    with watcher._lock:
+        return not watcher._pending and not watcher._running
+
+
+@pytest.mark.parametrize("use_watchdog", [False, True], ids=["polling", "watchdog"])
+def test_new_file_is_converted_once(tmp_path, capsys, use_watchdog):
+    if use_watchdog:
+        pytest.importorskip("watchdog")
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    src.mkdir()
+    make_docx(tmp_path / "doc.docx")
+    output = Output(capsys)
+
+    watcher = Watcher(src, dst, debounce=0.2, interval=0.1, max_workers=1, use_watchdog=use_watchdog)
+    stop_event, thread = start_watcher(watcher)
+    try:
+        shutil.copy(tmp_path / "doc.docx", src / "doc.docx")
+        wait_until(lambda: "Converted " in str(output))
+        # 转换本身会读取源文件；再等一个防抖周期，让误触发的转换有机会出现
+        time.sleep(watcher.debounce + watcher.interval)
+        wait_until(lambda: is_idle(watcher))
+    finally:
+        stop_event.set()
+        thread.join(10)
+
+    assert str(output).count("Converted ") == 1
+    assert (dst / "doc.md").read_text(encoding="utf-8").strip() == "Hello"
+
+
+def test_watching_continues_after_worker_dies(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(_watch, "convert_file", crash_on_bad_files)
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    src.mkdir()
+    make_docx(src / "bad.docx")
+    make_docx(src / "other.docx", "Other")
+    output = Output(capsys)
+
+    watcher = Watcher(src, dst, debounce=0.2, interval=0.1, max_workers=2, use_watchdog=False)
+    stop_event, thread = start_watcher(watcher)
+    try:
+        wait_until(lambda: "Failed to convert" in str(output) and "other.docx" in str(output))
+        make_docx(src / "good.docx")
+        wait_until(lambda: "good.docx" in str(output))
+    finally:
+        stop_event.set()
+        thread.join(10)
+
+    assert not thread.is_alive()
+    assert str(output).count("Failed to convert") == 1
+    assert "Failed to convert " + str(src / "bad.docx") in str(output)
+    assert (dst / "other.md").read_text(encoding="utf-8").strip() == "Other"
+    assert (dst / "good.md").read_text(encoding="utf-8").strip() == "Hello"